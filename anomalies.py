@@ -0,0 +1,165 @@
+import pandas as pd
+import numpy as np
+import logging
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 168
+
+
+class StreamingAnomalyDetector:
+    """
+    Потоковий детектор аномалій навантаження (сезонні залишки + робастний z-score).
+
+    Базова лінія — медіана відношення "значення / рівень за 24 год" для тієї ж
+    години тижня за попередні `weeks` тижнів (stride-вікно без циклів Python).
+    Масштаб — медіана |залишку| (MAD) за попередні `scale_hours` годин, що
+    переобчислюється раз на `scale_step` годин: поодинокі викиди на нього не впливають.
+    Детектор зберігає лише "хвости" історії, тож результат не залежить від розміру чанків.
+    """
+
+    def __init__(self, weeks: int = 4, scale_hours: int = 720, scale_step: int = 24):
+        self.weeks = weeks
+        self.scale_hours = scale_hours
+        self.scale_step = scale_step
+        self._history = None       # останні weeks*168 + 24 значення (із запасом на рівень за 24 год)
+        self._abs_history = None   # останні scale_hours + scale_step |залишків|
+        self._seen = 0             # оброблено значень від початку ряду
+
+    def update(self, values: np.ndarray):
+        """Обробляє наступний чанк. Повертає (baseline, z_score) для кожного значення."""
+        x = np.asarray(values, dtype=np.float64)
+        lag = self.weeks * HOURS_PER_WEEK
+
+        if self._history is None:
+            if len(x) < 2 * lag:
+                raise ValueError(f"Перший чанк має містити щонайменше {2 * lag} годин")
+            # На старті "минулих" тижнів немає — дзеркалимо наступні тижні (та ж година тижня)
+            history = x[lag:2 * lag]
+        else:
+            history = self._history
+
+        padded = np.concatenate([history, x])
+        # Рівень — середнє за попередні 24 години (кумулятивні суми): швидко
+        # відстежує сезонний дрейф та температурні хвилі
+        csum = np.concatenate([[0.0], np.cumsum(padded)])
+        end = np.maximum(np.arange(len(padded)), 1)
+        start = np.maximum(end - 24, 0)
+        level = (csum[end] - csum[start]) / (end - start)
+        ratio = padded / level
+
+        # Вікно з кроком 168: відношення тієї ж години за попередні weeks тижнів
+        offset = len(history) - lag
+        windows = sliding_window_view(ratio[offset:], lag + 1)[:, :lag:HOURS_PER_WEEK]
+        baseline = np.median(windows, axis=1) * level[len(history):]
+        resid = x - baseline
+
+        scale = self._robust_scale(np.abs(resid))
+        z = resid / scale
+
+        self._history = padded[-(lag + 24):].copy()
+        self._seen += len(x)
+        return baseline, z
+
+    def _robust_scale(self, abs_resid: np.ndarray) -> np.ndarray:
+        """
+        sigma ≈ 1.4826 * медіана |залишку| у вікні scale_hours, що закінчується на останній
+        "опорній" годині (кратній scale_step) перед поточною. Медіана береться лише по
+        опорних точках — O(n) замість ковзної медіани на кожну годину.
+        """
+        step, width = self.scale_step, self.scale_hours
+        abs_prev = self._abs_history if self._abs_history is not None else np.empty(0)
+        abs_all = np.concatenate([abs_prev, abs_resid])
+        base = self._seen - len(abs_prev)  # глобальний індекс abs_all[0]
+
+        positions = self._seen + np.arange(len(abs_resid))
+        # На самому початку (перша доба) опорною є кінець першої доби
+        anchors, inverse = np.unique(np.maximum(positions // step * step, step), return_inverse=True)
+        ends = anchors - base
+        mad = np.empty(len(anchors))
+        full = np.flatnonzero(ends >= width)
+        if len(full):
+            frames = sliding_window_view(abs_all, width)
+            for lo in range(0, len(full), 2048):  # пакетами: копіюється лише пакет вікон
+                part = full[lo:lo + 2048]
+                mad[part] = np.median(frames[ends[part] - width], axis=1)
+        for k in np.flatnonzero(ends < width):
+            mad[k] = np.median(abs_all[:ends[k]])
+
+        self._abs_history = abs_all[-(width + step):].copy()
+        return np.maximum(1.4826 * mad[inverse], 1e-6)
+
+
+def detect_anomalies(df: pd.DataFrame, threshold: float = 5.0, weeks: int = 4,
+                     chunk_hours: int = 1_000_000) -> pd.DataFrame:
+    """
+    Знаходить аномальні години у погодинному ряді load_mw.
+    Повертає таблицю подій: timestamp, load_mw, baseline, z_score, kind.
+    """
+    load = df['load_mw'].to_numpy()
+    n = len(load)
+    weeks = min(weeks, n // (2 * HOURS_PER_WEEK))
+    if weeks == 0:
+        logger.warning("Замало даних для пошуку аномалій (потрібно щонайменше 2 тижні).")
+        return _empty_events()
+
+    detector = StreamingAnomalyDetector(weeks=weeks)
+    baseline = np.empty(n)
+    z = np.empty(n)
+    # Перший чанк має вмістити дзеркальний старт
+    first = max(chunk_hours, 2 * weeks * HOURS_PER_WEEK)
+    bounds = [0] + list(range(first, n, chunk_hours)) + [n]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi > lo:
+            baseline[lo:hi], z[lo:hi] = detector.update(load[lo:hi])
+
+    idx = np.flatnonzero(np.abs(z) >= threshold)
+    events = pd.DataFrame({
+        'index': idx,
+        'timestamp': df['timestamp'].to_numpy()[idx],
+        'load_mw': load[idx],
+        'baseline': baseline[idx].round(1),
+        'z_score': z[idx].round(2),
+        'kind': np.where(z[idx] > 0, 'Стрибок', 'Падіння'),
+    })
+    logger.info(f"Аномалій знайдено: {len(events)} з {n} годин (поріг |z| >= {threshold})")
+    return events
+
+
+def _empty_events() -> pd.DataFrame:
+    return pd.DataFrame({
+        'index': np.empty(0, dtype=np.int64), 'timestamp': pd.to_datetime([]),
+        'load_mw': np.empty(0), 'baseline': np.empty(0), 'z_score': np.empty(0),
+        'kind': np.empty(0, dtype=object),
+    })
+
+
+def evaluate_detection(events: pd.DataFrame, df: pd.DataFrame, min_effect: float = 0.15) -> dict:
+    """
+    Precision/recall відносно інжектованих аномалій (df.attrs від generate_power_load_data).
+    Recall рахується лише для аномалій з ефектом |множник - 1| >= min_effect:
+    множник ~1.0 фізично не відрізняється від шуму.
+    """
+    truth_idx = np.asarray(df.attrs.get('anomaly_indices', []))
+    factors = np.asarray(df.attrs.get('anomaly_factors', np.ones(len(truth_idx))))
+    if len(truth_idx) == 0:
+        return {}
+
+    detected = np.zeros(len(df), dtype=bool)
+    detected[events['index'].to_numpy()] = True
+    injected = np.zeros(len(df), dtype=bool)
+    injected[truth_idx] = True
+    significant = truth_idx[np.abs(factors - 1) >= min_effect]
+
+    tp = int((detected & injected).sum())
+    precision = tp / max(int(detected.sum()), 1)
+    recall = float(detected[significant].mean()) if len(significant) else 0.0
+    return {
+        'detected': int(detected.sum()),
+        'injected': len(truth_idx),
+        'true_positives': tp,
+        'precision': round(precision, 3),
+        'recall': round(recall, 3),
+    }
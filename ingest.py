@@ -0,0 +1,211 @@
+import pandas as pd
+import numpy as np
+import logging
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Числові колонки у форматі power_load_data.csv та їхні типи
+NUMERIC_COLUMNS = {
+    'load_mw': np.float32,
+    'temperature_c': np.float32,
+    'wind_mps': np.float32,
+    'capacity_mw': np.float32,
+    'is_holiday': np.float32,
+}
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+NS_PER_HOUR = 3_600_000_000_000
+# Явний зсув поясу в кінці ISO8601-рядка: Z, +02:00, -0500
+UTC_OFFSET_PATTERN = r'(?:Z|[+-]\d{2}:?\d{2})$'
+
+
+def _parse_timestamps(values: pd.Series, tz: str) -> np.ndarray:
+    """
+    Швидкий парсинг часу: спершу фіксований формат (C-парсер без вгадування),
+    рядки, що йому не відповідають, — повторно як ISO8601 (будь-яка їх частка).
+    Рядки без поясу — це вже локальний час (як і у шляху pyarrow);
+    лише значення зі зсувом (+02:00, Z) переводяться у tz і стають локальними без поясу.
+    Повертає int64 номер години від епохи (NaT -> -1).
+    """
+    ts = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors='coerce').astype('datetime64[ns]')
+    retry = ts.isna() & values.notna()
+    if retry.any():
+        has_offset = values.str.contains(UTC_OFFSET_PATTERN, na=False)
+        naive, aware = retry & ~has_offset, retry & has_offset
+        if naive.any():
+            ts[naive] = pd.to_datetime(values[naive], format='ISO8601', errors='coerce').astype('datetime64[ns]')
+        if aware.any():
+            parsed = pd.to_datetime(values[aware], format='ISO8601', errors='coerce', utc=True)
+            ts[aware] = parsed.dt.tz_convert(tz).dt.tz_localize(None).astype('datetime64[ns]')
+    ns = ts.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    hours = np.floor_divide(ns, NS_PER_HOUR)
+    hours[ts.isna().to_numpy()] = -1
+    return hours
+
+
+def _iter_chunks_pandas(path, value_cols, chunksize, tz):
+    """Резервний шлях: C-парсер pandas чанками з явними типами."""
+    dtypes = {c: NUMERIC_COLUMNS[c] for c in value_cols}
+    dtypes['timestamp'] = str
+    reader = pd.read_csv(path, usecols=['timestamp'] + value_cols, dtype=dtypes,
+                         chunksize=chunksize, engine='c')
+    for chunk in reader:
+        yield _parse_timestamps(chunk['timestamp'], tz), chunk[value_cols]
+
+
+def _iter_chunks_arrow(path, value_cols, chunksize):
+    """
+    Швидкий шлях (якщо встановлено pyarrow): потоковий багатопотоковий CSV-рідер,
+    час парсится одразу у timestamp без проміжних рядків Python.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    column_types = {c: pa.float32() for c in value_cols}
+    column_types['timestamp'] = pa.timestamp('s')
+    reader = pa_csv.open_csv(
+        path,
+        # ~40 байт на рядок: розмір блоку відповідає chunksize
+        read_options=pa_csv.ReadOptions(block_size=max(1 << 20, chunksize * 40)),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types,
+                                              include_columns=['timestamp'] + value_cols)
+    )
+    for batch in reader:
+        ts = batch.column('timestamp')
+        hours = ts.fill_null(0).to_numpy().astype('datetime64[h]').astype(np.int64)
+        hours[ts.is_null().to_numpy(zero_copy_only=False)] = -1
+        values = pd.DataFrame({c: batch.column(c).to_numpy(zero_copy_only=False) for c in value_cols})
+        yield hours, values
+
+
+def _iter_chunks(path, value_cols, chunksize, tz):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        yield from _iter_chunks_pandas(path, value_cols, chunksize, tz)
+        return
+    started = False
+    try:
+        for item in _iter_chunks_arrow(path, value_cols, chunksize):
+            started = True
+            yield item
+    except pyarrow.ArrowInvalid as e:
+        if started:
+            raise
+        # Напр. час з часовими поясами — переходимо на pandas-парсер
+        logger.warning(f"pyarrow не зміг розібрати CSV ({e}), використовуємо pandas.")
+        yield from _iter_chunks_pandas(path, value_cols, chunksize, tz)
+
+
+def _aggregate_chunk(hours: np.ndarray, values: pd.DataFrame) -> pd.DataFrame:
+    """Сума та кількість значень кожної колонки по годинах для одного чанку."""
+    valid = hours >= 0
+    # Від'ємне/нульове навантаження — збій лічильника, вважаємо пропуском
+    values = values.assign(load_mw=values['load_mw'].where(values['load_mw'] > 0))
+
+    grouped = values[valid].groupby(hours[valid])
+    sums = grouped.sum(min_count=1).add_suffix('__sum')
+    counts = grouped.count().add_suffix('__cnt')
+    return pd.concat([sums, counts], axis=1)
+
+
+def _collapse(parts):
+    """Об'єднує часткові агрегати (години на межах чанків додаються)."""
+    combined = pd.concat(parts)
+    return combined.groupby(level=0).sum(min_count=1)
+
+
+def read_load_csv(path: str, chunksize: int = 2_000_000, tz: str = 'Europe/Kyiv',
+                  max_interp_hours: int = 6):
+    """
+    Читає великий CSV (погодинний або 15-хвилинний) чанками з явними типами.
+    У пам'яті тримаються лише погодинні агрегати, тож файл може бути більшим за RAM.
+    Повертає (df у форматі generate_power_load_data, звіт про ремонт даних).
+    """
+    logger.info(f"Імпорт виміряних даних: {path}")
+
+    header = pd.read_csv(path, nrows=0).columns
+    if 'timestamp' not in header or 'load_mw' not in header:
+        raise ValueError("CSV має містити колонки 'timestamp' та 'load_mw'")
+
+    value_cols = [c for c in NUMERIC_COLUMNS if c in header]
+
+    parts = []
+    rows_read = unparsed_rows = 0
+    for hours, values in _iter_chunks(path, value_cols, chunksize, tz):
+        rows_read += len(hours)
+        unparsed_rows += int((hours < 0).sum())
+        parts.append(_aggregate_chunk(hours, values))
+        # Періодично згортаємо, щоб пам'ять не росла з кількістю чанків
+        if len(parts) >= 16:
+            parts = [_collapse(parts)]
+        logger.info(f"Імпорт: прочитано {rows_read} рядків")
+
+    if not parts:
+        raise ValueError("CSV не містить даних")
+
+    agg = _collapse(parts)
+    counts = agg['load_mw__cnt']
+    samples_per_hour = int(np.median(counts[counts > 0])) if (counts > 0).any() else 1
+
+    hourly = pd.DataFrame(index=agg.index)
+    for col in value_cols:
+        hourly[col] = agg[f'{col}__sum'] / agg[f'{col}__cnt'].replace(0, np.nan)
+
+    df, report = repair_hourly(hourly, max_interp_hours)
+    report.update({
+        'rows_read': rows_read,
+        # Рядки з нерозпізнаним часом: відкинуті, їхні години заповнені як пропуски
+        'unparsed_rows': unparsed_rows,
+        'samples_per_hour': samples_per_hour,
+        # Години з більшою кількістю відліків, ніж зазвичай (дублікати переходу DST)
+        'duplicate_hours': int((counts > samples_per_hour).sum()),
+    })
+    if unparsed_rows:
+        logger.warning(f"Імпорт: не розпізнано час у {unparsed_rows} рядках — їх відкинуто")
+    logger.info(f"Імпорт завершено: {report}")
+    return df, report
+
+
+def repair_hourly(hourly: pd.DataFrame, max_interp_hours: int = 6):
+    """
+    Доповнює пропуски до безперервного погодинного ряду.
+    Короткі пропуски — лінійна інтерполяція, довгі — середній профіль години тижня.
+    """
+    first, last = int(hourly.index.min()), int(hourly.index.max())
+    full_index = np.arange(first, last + 1, dtype=np.int64)
+    hourly = hourly.reindex(full_index)
+
+    missing = hourly['load_mw'].isna().to_numpy()
+    timestamps = pd.to_datetime(full_index * NS_PER_HOUR)
+    hour_of_week = (timestamps.dayofweek * 24 + timestamps.hour).to_numpy()
+
+    for col in hourly.columns:
+        series = hourly[col].interpolate(limit=max_interp_hours, limit_area='inside')
+        if series.isna().any():
+            profile = series.groupby(hour_of_week).mean()
+            series = series.fillna(pd.Series(profile.reindex(hour_of_week).to_numpy(), index=series.index))
+        hourly[col] = series
+
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'load_mw': hourly['load_mw'].to_numpy(np.float32).round(1),
+        'temperature_c': _column_or_nan(hourly, 'temperature_c'),
+        'wind_mps': _column_or_nan(hourly, 'wind_mps'),
+        'is_holiday': (_column_or_nan(hourly, 'is_holiday') >= 0.5).astype(np.int8),
+        'capacity_mw': _column_or_nan(hourly, 'capacity_mw'),
+        'year': timestamps.year.astype(np.int16),
+    })
+
+    report = {
+        'hours': len(df),
+        'gap_hours_filled': int(missing.sum()),
+    }
+    return df, report
+
+
+def _column_or_nan(hourly: pd.DataFrame, col: str) -> np.ndarray:
+    if col in hourly:
+        return hourly[col].to_numpy(np.float32).round(1)
+    return np.full(len(hourly), np.nan, dtype=np.float32)
+
@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+import cProfile
+import pstats
+import io
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+_listener = None
+
+
+def setup_queue_logging(handlers):
+    """
+    Переводить кореневий логер на неблокуючий QueueHandler.
+    Реальний запис (файл/консоль) виконує фоновий QueueListener,
+    тож робочий потік не чекає на дискові операції.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+    return _listener
+
+
+def stop_queue_logging():
+    """Дочитує чергу логів та зупиняє фоновий потік запису."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def current_memory_mb() -> float:
+    """Поточний обсяг пам'яті процесу (RSS) у МБ. Без psutil — найкраща оцінка ОС."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS повертає байти, Linux — кілобайти
+        return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return 0.0
+
+
+class Span:
+    """Вимір одного етапу: тривалість, кількість рядків, зміна пам'яті."""
+
+    def __init__(self, name: str, rows: int = None):
+        self.name = name
+        self.rows = rows
+        self.ms = 0.0
+        self.mem_mb = 0.0
+        self.mem_delta_mb = 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        if not self.rows or self.ms <= 0:
+            return 0.0
+        return self.rows / (self.ms / 1000)
+
+    def as_record(self) -> dict:
+        return {
+            'stage': self.name,
+            'ms': round(self.ms, 1),
+            'rows': self.rows or 0,
+            'rows_per_s': round(self.rows_per_s),
+            'mem_mb': round(self.mem_mb, 1),
+            'mem_delta_mb': round(self.mem_delta_mb, 1),
+        }
+
+
+class Instrumentation:
+    """
+    Збирає виміри етапів пайплайна та оновлення вкладок.
+    Слухачі (наприклад, панель "Статус") отримують кожен завершений Span.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    @contextmanager
+    def span(self, name: str, rows: int = None):
+        s = Span(name, rows)
+        mem_before = current_memory_mb()
+        t0 = time.perf_counter()
+        try:
+            yield s
+        finally:
+            s.ms = (time.perf_counter() - t0) * 1000
+            s.mem_mb = current_memory_mb()
+            s.mem_delta_mb = s.mem_mb - mem_before
+            self._record(s)
+
+    def _record(self, s: Span):
+        with self._lock:
+            self.spans.append(s)
+        record = s.as_record()
+        logger.info(
+            "STAGE %(stage)s | %(ms).1f ms | %(rows)d rows | %(rows_per_s)d rows/s | "
+            "%(mem_mb).1f MB (%(mem_delta_mb)+.1f)", record,
+            extra={'stage_metrics': record}
+        )
+        for callback in self.listeners:
+            try:
+                callback(s)
+            except Exception as e:
+                logger.warning(f"Слухач інструментації впав: {e}")
+
+    def format_breakdown(self, limit: int = 12) -> str:
+        """Текстова таблиця (етап, мс, рядків/с, МБ) для панелі статусу."""
+        with self._lock:
+            spans = self.spans[-limit:]
+        if not spans:
+            return ""
+        lines = [f"{'Етап':<22}{'мс':>9}{'рядк/с':>12}{'МБ':>8}"]
+        for s in spans:
+            rate = f"{s.rows_per_s / 1e6:.2f}M" if s.rows_per_s >= 1e6 else f"{s.rows_per_s:.0f}"
+            lines.append(f"{s.name[:21]:<22}{s.ms:>9.1f}{rate:>12}{s.mem_mb:>8.0f}")
+        return "\n".join(lines)
+
+
+# Спільний екземпляр для всього застосунку
+tracker = Instrumentation()
+
+
+@contextmanager
+def profiled(enabled: bool, output_dir: str, top: int = 25):
+    """
+    Вмикає cProfile для одного запуску.
+    Зберігає .prof файл у output_dir та пише топ функцій у лог.
+    """
+    if not enabled:
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(output_dir, exist_ok=True)
+        prof_file = os.path.join(output_dir, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        profiler.dump_stats(prof_file)
+
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats('cumulative').print_stats(top)
+        logger.info(f"cProfile збережено: {prof_file}\n{buf.getvalue()}")
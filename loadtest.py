@@ -0,0 +1,105 @@
+"""
+Навантажувальний тест локального API (server.py): запитів/с та перцентилі затримки.
+
+    python loadtest.py --port 8765 --concurrency 32 --duration 10
+
+Кожен клієнт тримає keep-alive з'єднання і по колу запитує суміш ендпоінтів.
+"""
+import sys
+import time
+import json
+import random
+import asyncio
+import argparse
+import numpy as np
+
+DEFAULT_PATHS = [
+    '/api/day?date={year}-{month:02d}-{day:02d}',
+    '/api/monthly?year={year}',
+    '/api/daily?year={year}&month={month}',
+    '/api/yearly',
+]
+
+
+async def _request(reader, writer, host: str, path: str):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    length = next(int(line.split(':', 1)[1]) for line in lines[1:] if line.lower().startswith('content-length'))
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def _client(host, port, paths, deadline, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            path = rng.choice(paths)
+            t0 = time.perf_counter()
+            status, _ = await _request(reader, writer, host, path)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append((status, path))
+    finally:
+        writer.close()
+
+
+def _expand(paths, years, samples: int, rng):
+    """Шаблони шляхів -> конкретні URL (samples варіантів, щоб перевірити і кеш, і промахи)."""
+    result = []
+    for _ in range(samples):
+        values = {'year': rng.choice(years), 'month': rng.randint(1, 12), 'day': rng.randint(1, 28)}
+        result.extend(p.format(**values) for p in paths)
+    return sorted(set(result))
+
+
+async def run(host, port, concurrency, duration, generate, samples, seed):
+    reader, writer = await asyncio.open_connection(host, port)
+    start, _, end = generate.partition('-')
+    _, body = await _request(reader, writer, host, f"/api/generate?start={start}&end={end or start}&seed=42")
+    writer.close()
+    info = json.loads(body)
+    if 'error' in info:
+        raise SystemExit(f"Генерація не вдалася: {info['error']}")
+    print(f"Набір: {info['dataset']} ({info['rows']} записів)")
+
+    rng = random.Random(seed)
+    paths = _expand(DEFAULT_PATHS, list(range(int(start), int(end or start) + 1)), samples, rng)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, paths, deadline, latencies, errors, random.Random(seed + i))
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - t0
+
+    ms = np.array(latencies) * 1000
+    print(f"Запитів: {len(ms)} за {elapsed:.1f} с, унікальних URL: {len(paths)}, "
+          f"з'єднань: {concurrency}, помилок: {len(errors)}")
+    if len(ms):
+        print(f"RPS: {len(ms) / elapsed:,.0f}")
+        print(f"Затримка, мс: p50 {np.percentile(ms, 50):.2f} | p90 {np.percentile(ms, 90):.2f} | "
+              f"p99 {np.percentile(ms, 99):.2f} | max {ms.max():.2f}")
+    return len(errors) == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Навантажувальний тест API Energy Monitor")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0, help="Секунд навантаження")
+    parser.add_argument('--generate', default='2020-2024', help="Період набору, що генерується перед тестом")
+    parser.add_argument('--samples', type=int, default=50, help="Варіантів параметрів на шаблон URL")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    ok = asyncio.run(run(args.host, args.port, args.concurrency, args.duration,
+                         args.generate, args.samples, args.seed))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
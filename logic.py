@@ -4,9 +4,19 @@ import os
 import logging
 from datetime import datetime
 
+import peaks
+import reserve
+import storage
+
 # Отримуємо логер для цього модуля
 logger = logging.getLogger(__name__)
 
+MONTH_NAMES_UA = {
+    1: 'Січень', 2: 'Лютий', 3: 'Березень', 4: 'Квітень',
+    5: 'Травень', 6: 'Червень', 7: 'Липень', 8: 'Серпень',
+    9: 'Вересень', 10: 'Жовтень', 11: 'Листопад', 12: 'Грудень'
+}
+
 def generate_power_load_data(start_year: int, end_year: int, random_seed: int = None) -> pd.DataFrame:
     """
     PRO VERSION: Генерує дані з урахуванням економічних трендів та аномалій.
@@ -14,8 +24,9 @@ def generate_power_load_data(start_year: int, end_year: int, random_seed: int =
     """
     logger.info(f"Початок генерації PRO даних: {start_year}-{end_year}, Seed: {random_seed}")
     
-    if random_seed is not None:
-        np.random.seed(random_seed)
+    # Локальний генератор: паралельні виклики (HTTP-сервіс, Live-режим) не змішують потоки
+    # випадкових чисел; RandomState(seed) дає ту саму послідовність, що й np.random.seed(seed)
+    rng = np.random.RandomState(random_seed)
     
     start_date = f'{start_year}-01-01'
     end_date = f'{end_year}-12-31'
@@ -35,7 +46,7 @@ def generate_power_load_data(start_year: int, end_year: int, random_seed: int =
     
     base_temp = 10 + 25 * np.sin(2 * np.pi * (day_of_year - 15) / 365) + climate_trend
     daily_temp_variation = 8 * np.sin(2 * np.pi * (hour - 6) / 24)
-    temp_noise = np.random.normal(0, 2, n)
+    temp_noise = rng.normal(0, 2, n)
     
     temperature_c = base_temp + daily_temp_variation + temp_noise
     
@@ -60,7 +71,7 @@ def generate_power_load_data(start_year: int, end_year: int, random_seed: int =
     load_mw = (base_load + temp_effect) * seasonal_factor * weekday_factor * growth_factor
     
     # Додаємо шум
-    random_noise = np.random.normal(0, 120, n)
+    random_noise = rng.normal(0, 120, n)
     load_mw += random_noise
     
     # Пікові години (Ранковий та вечірній пік)
@@ -69,9 +80,10 @@ def generate_power_load_data(start_year: int, end_year: int, random_seed: int =
     
     # --- АНОМАЛІЇ (Імітація аварій/викидів) ---
     # 0.1% шанс аномалії (приблизно 8-10 годин на рік)
-    anomaly_indices = np.random.choice(n, size=int(n * 0.001), replace=False)
+    anomaly_indices = rng.choice(n, size=int(n * 0.001), replace=False)
     # Аномалії можуть бути падінням (аварія) або стрибком
-    load_mw[anomaly_indices] *= np.random.uniform(0.6, 1.4, size=len(anomaly_indices))
+    anomaly_factors = rng.uniform(0.6, 1.4, size=len(anomaly_indices))
+    load_mw[anomaly_indices] *= anomaly_factors
 
     # Свята (Україна)
     holidays_list = []
@@ -86,9 +98,9 @@ def generate_power_load_data(start_year: int, end_year: int, random_seed: int =
     is_holiday = date_range.normalize().isin(holiday_dates).astype(int)
     
     # Генерація (Вітер) та Потужність станцій
-    wind_mps = np.random.gamma(2, 1.5, n)
+    wind_mps = rng.gamma(2, 1.5, n)
     power_base = load_mw + 1000 # Резерв потужності
-    capacity_mw = power_base + np.random.normal(0, 80, n)
+    capacity_mw = power_base + rng.normal(0, 80, n)
     
     # Кліпінг (Захист від нереальних значень) та оптимізація типів (float32)
     df = pd.DataFrame({
@@ -101,6 +113,10 @@ def generate_power_load_data(start_year: int, end_year: int, random_seed: int =
         'year': date_range.year.astype(np.int16)
     })
     
+    # Еталон для оцінки детектора аномалій (precision/recall)
+    df.attrs['anomaly_indices'] = np.sort(anomaly_indices)
+    df.attrs['anomaly_factors'] = anomaly_factors[np.argsort(anomaly_indices)]
+    
     logger.info("Генерація завершена успішно.")
     return df
 
@@ -111,14 +127,9 @@ def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
     df['date'] = df['timestamp'].dt.date
     df['month'] = df['timestamp'].dt.month
     
-    month_names_ua = {
-        1: 'Січень', 2: 'Лютий', 3: 'Березень', 4: 'Квітень',
-        5: 'Травень', 6: 'Червень', 7: 'Липень', 8: 'Серпень',
-        9: 'Вересень', 10: 'Жовтень', 11: 'Листопад', 12: 'Грудень'
-    }
-    df['month_name'] = df['month'].map(month_names_ua)
+    df['month_name'] = df['month'].map(MONTH_NAMES_UA)
     
-    month_order = {name: i for i, name in month_names_ua.items()}
+    month_order = {name: i for i, name in MONTH_NAMES_UA.items()}
     df['month_order'] = df['month_name'].map(month_order)
     
     df['quarter'] = df['timestamp'].dt.quarter
@@ -134,24 +145,58 @@ def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
     
     return df
 
-def create_csv_reports(df: pd.DataFrame, output_dir: str, random_mode: str):
+def create_csv_reports(df: pd.DataFrame, output_dir: str, random_mode: str,
+                       peak_data: dict = None, reserve_data: dict = None,
+                       db_path: str = None, run_name: str = None):
     """
     Створює професійний Excel звіт (.xlsx) та резервний CSV.
+    peak_data / reserve_data — готові результати peaks / reserve (інакше рахуються тут).
+    db_path — опційне сховище SQLite (storage.py), куди додається прогін зі зведеннями.
+    Окремі кроки (export_raw_csv, create_excel_report, create_text_report) використовує
+    і інкрементальний конвеєр (pipeline.py).
     """
     logger.info(f"Початок експорту звітів у: {output_dir}")
+    output_path = ensure_output_dir(output_dir)
+
+    if peak_data is None:
+        peak_data = peaks.compute_peak_analytics(df)
+    if reserve_data is None:
+        reserve_data = reserve.compute_reserve_analytics(df)
+
+    # 1-2. Технічні CSV та Excel звіт
+    export_raw_csv(df, output_path, reserve_data)
+    create_excel_report(df, output_path, random_mode, peak_data, reserve_data)
+
+    # 3. Опційне індексоване сховище SQLite
+    if db_path:
+        storage.save_run(db_path, df, run_name or get_random_mode_description(random_mode), random_mode)
+
+    # 4. Короткий текстовий звіт
+    create_text_report(df, output_path, random_mode)
+
+def ensure_output_dir(output_dir: str) -> str:
     output_path = os.path.abspath(output_dir)
-    
     if not os.path.exists(output_path):
         os.makedirs(output_path)
-    
-    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M")
-    
-    # 1. Збереження Raw Data (CSV) - Технічний файл
+    return output_path
+
+def export_raw_csv(df: pd.DataFrame, output_path: str, reserve_data: dict) -> list:
+    """Raw Data та епізоди резерву (CSV). Повертає шляхи створених файлів."""
+    # Raw Data (CSV) - Технічний файл
     csv_file = os.path.join(output_path, "raw_data.csv")
     df.to_csv(csv_file, index=False, encoding='utf-8')
     logger.info(f"CSV збережено: {csv_file}")
 
-    # 2. Підготовка зведених таблиць (Analytics)
+    # Епізоди низького резерву / дефіциту потужності (CSV)
+    reserve_file = os.path.join(output_path, "reserve_events.csv")
+    reserve_data['events'].to_csv(reserve_file, index=False, encoding='utf-8')
+    logger.info(f"CSV епізодів резерву збережено: {reserve_file}")
+    return [csv_file, reserve_file]
+
+def create_excel_report(df: pd.DataFrame, output_path: str, random_mode: str,
+                        peak_data: dict, reserve_data: dict):
+    """Excel звіт (Business Report). Повертає шлях до файлу або None, якщо його не створено."""
+    # Підготовка зведених таблиць (Analytics)
     daily_pivot = pd.pivot_table(
         df, values='load_mw', index=[df['timestamp'].dt.date, 'month_name'],
         columns='day_type', aggfunc='mean'
@@ -162,7 +207,7 @@ def create_csv_reports(df: pd.DataFrame, output_dir: str, random_mode: str):
         columns='year', aggfunc='mean'
     ).round(1)
 
-    # 3. Генерація Excel звіту (Business Report)
+    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M")
     excel_file = os.path.join(output_path, f"Report_{timestamp_str}.xlsx")
     
     try:
@@ -172,6 +217,17 @@ def create_csv_reports(df: pd.DataFrame, output_dir: str, random_mode: str):
             daily_pivot.to_excel(writer, sheet_name='Денна статистика')
             monthly_pivot.to_excel(writer, sheet_name='Місячна статистика')
             
+            # Пікова аналітика: топ-N годин, місячні (коінцидентні) піки, криві тривалості
+            peak_data['top'].to_excel(writer, sheet_name='Піки (Топ-N)', index=False)
+            peak_data['monthly'].to_excel(writer, sheet_name='Місячні піки', index=False)
+            peak_data['duration_table'].to_excel(writer, sheet_name='Криві тривалості', index_label='Рік')
+            peak_data['monthly_duration_table'].to_excel(writer, sheet_name='Криві тривалості (міс.)',
+                                                         index_label=['Рік', 'Місяць'])
+            
+            # Резерв потужності: зведення епізодів по місяцях та роках
+            reserve_data['monthly'].to_excel(writer, sheet_name='Резерв (місяці)', index=False)
+            reserve_data['yearly'].to_excel(writer, sheet_name='Резерв (роки)', index=False)
+            
             # Аркуш 2: Метадані (Audit Trail)
             info_df = pd.DataFrame({
                 'Параметр': ['Час генерації', 'Період', 'Режим', 'Записів оброблено', 'Середнє навантаження'],
@@ -195,14 +251,13 @@ def create_csv_reports(df: pd.DataFrame, output_dir: str, random_mode: str):
                     except: pass
             
         logger.info(f"Excel звіт успішно створено: {excel_file}")
+        return excel_file
         
     except ImportError:
         logger.warning("Модуль openpyxl не встановлено. Excel звіт пропущено (тільки CSV).")
     except Exception as e:
         logger.error(f"Помилка при створенні Excel: {e}")
-
-    # 4. Короткий текстовий звіт
-    create_text_report(df, output_path, random_mode)
+    return None
 
 def create_text_report(df, output_path, random_mode):
     report_file = os.path.join(output_path, "summary.txt")
@@ -217,6 +272,7 @@ def create_text_report(df, output_path, random_mode):
         f.write(f"Макс. навантаження: {df['load_mw'].max():.1f} МВт\n")
         
     logger.info("Текстовий звіт створено.")
+    return report_file
 
 def get_random_mode_description(mode):
     return "Детермінований (Seed 42)" if mode == "reproducible" else "Стохастичний (Випадковий)"
@@ -10,23 +10,29 @@ matplotlib.rcParams['font.family'] = 'DejaVu Sans'
 
 # Імпорт наших модулів
 from ui_generation import GenerationTab
-from ui_analysis import HourlyTab, MonthlyMonitorTab, DailyConsumptionTab, MonthlyConsumptionTab
+from ui_analysis import HourlyTab, MonthlyMonitorTab, DailyConsumptionTab, MonthlyConsumptionTab, AnomalyTab, SensitivityTab, PeakTab, ReserveTab, SpectralTab, LiveTab
+import instrumentation
+import scenarios
+import storage
+import pipeline
 
 # --- НАЛАШТУВАННЯ ЛОГУВАННЯ (PROFESSIONAL LOGGING) ---
-logging.basicConfig(
-    filename='energy_system.log',
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(module)s:%(lineno)d | %(message)s',
-    encoding='utf-8',
+file_handler = logging.FileHandler('energy_system.log', encoding='utf-8')
+file_handler.setFormatter(logging.Formatter(
+    '%(asctime)s | %(levelname)s | %(module)s:%(lineno)d | %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
-)
+))
 
 # Дублюємо логи в консоль (для розробника)
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setLevel(logging.INFO)
 formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s')
 console_handler.setFormatter(formatter)
-logging.getLogger().addHandler(console_handler)
+
+# Запис у файл/консоль виконує фоновий потік (QueueListener),
+# щоб логування не гальмувало робочий потік аналізу
+logging.getLogger().setLevel(logging.INFO)
+instrumentation.setup_queue_logging([file_handler, console_handler])
 
 class PowerLoadAnalysisApp:
     def __init__(self, root):
@@ -55,9 +61,27 @@ class PowerLoadAnalysisApp:
         
         # --- СТАН ДОДАТКУ (STATE) ---
         self.df = None
+        self.analytics = {}  # Результати аналітичних модулів (аномалії тощо)
+        
+        # Іменовані датасети та режим порівняння
+        self.scenarios = scenarios.ScenarioStore()
+        self.active_scenario = tk.StringVar(value="")
+        self.compare_with = tk.StringVar(value=scenarios.NO_COMPARISON)
+        self.comparison = None
+        
+        # Відбитки активних даних та порівнюваного сценарію (стабільні, не id() об'єктів)
+        self.data_fingerprint = None
+        self.comparison_fingerprint = None
+        # Входи (tab.view_inputs()), з якими востаннє оновлювалась кожна вкладка
+        self.view_inputs = {}
+        
+        # Прогін, відкритий з SQLite для перегляду зрізами (замість self.df)
+        self.stored_run = None
+        self.store_enabled = tk.BooleanVar(value=False)
         self.start_year = tk.StringVar(value="2024")
         self.end_year = tk.StringVar(value="2024")
         self.random_mode = tk.StringVar(value="reproducible")
+        self.profile_enabled = tk.BooleanVar(value=False)
         
         # Автоматично створюємо папку results, якщо немає
         default_dir = os.path.join(os.getcwd(), "results")
@@ -70,6 +94,7 @@ class PowerLoadAnalysisApp:
         self.progress = tk.DoubleVar()
         self.status_text = tk.StringVar(value="Система готова. Очікування команд оператора.")
         self.result_text = tk.StringVar(value="")
+        self.metrics_text = tk.StringVar(value="")
 
         # --- ІНТЕРФЕЙС ---
         self.notebook = ttk.Notebook(self.root)
@@ -79,15 +104,21 @@ class PowerLoadAnalysisApp:
         self.gen_tab = GenerationTab(self.notebook, self)
         self.notebook.add(self.gen_tab, text="⚙️ КЕРУВАННЯ")
 
-        # Вкладки 2-5: Аналітика
+        # Вкладки аналітики
         self.analysis_tabs = [
             HourlyTab(self.notebook, self),
             MonthlyMonitorTab(self.notebook, self),
             DailyConsumptionTab(self.notebook, self),
-            MonthlyConsumptionTab(self.notebook, self)
+            MonthlyConsumptionTab(self.notebook, self),
+            AnomalyTab(self.notebook, self),
+            SensitivityTab(self.notebook, self),
+            PeakTab(self.notebook, self),
+            ReserveTab(self.notebook, self),
+            SpectralTab(self.notebook, self),
+            LiveTab(self.notebook, self)
         ]
         
-        titles = ["📈 Погодинний аналіз", "📊 Місячний звіт", "📅 Добове споживання", "📆 Річна статистика"]
+        titles = ["📈 Погодинний аналіз", "📊 Місячний звіт", "📅 Добове споживання", "📆 Річна статистика", "⚠️ Аномалії", "🌡️ Чутливість", "🏔 Піки", "🔋 Резерв", "🎼 Спектр", "📡 Live"]
         for tab, title in zip(self.analysis_tabs, titles):
             self.notebook.add(tab, text=title)
 
@@ -175,16 +206,95 @@ class PowerLoadAnalysisApp:
         style.configure('Card.TLabel', background=self.colors['bg_lighter'], foreground=self.colors['text'])
 
     def refresh_all_tabs(self):
-        """Оновлення даних у всіх вкладках після генерації"""
+        """Оновлення даних у вкладках, чиї входи (tab.view_inputs()) змінились з попереднього оновлення"""
         logging.info("Оновлення інтерфейсу (refresh_all_tabs)...")
+        rows = len(self.df) if self.df is not None else 0
+        skipped = []
         for tab in self.analysis_tabs:
-            if hasattr(tab, 'update_controls_state'):
-                tab.update_controls_state()
-            if hasattr(tab, 'update_data'):
-                tab.update_data()
+            name = type(tab).__name__
+            inputs = tab.view_inputs()
+            if name in self.view_inputs and self.view_inputs[name] == inputs:
+                skipped.append(name)
+                continue
+            with instrumentation.tracker.span(f"tab:{name}", rows):
+                if hasattr(tab, 'update_controls_state'):
+                    tab.update_controls_state()
+                if hasattr(tab, 'update_data'):
+                    tab.update_data()
+            self.view_inputs[name] = inputs
+        if skipped:
+            logging.info(f"Вкладки пропущено — входи не змінились: {', '.join(skipped)}")
+
+    def register_dataset(self, name, df, analytics, fingerprint=None):
+        """Додає новий датасет до сценаріїв та робить його активним"""
+        # Ті самі параметри конвеєра (або той самий файл) — той самий сценарій, без дубліката
+        final_name = (fingerprint and self.scenarios.find(fingerprint)) or \
+            self.scenarios.add(name, df, analytics, fingerprint)
+        self.gen_tab.refresh_scenario_lists()
+        self.activate_scenario(final_name)
+
+    def activate_scenario(self, name):
+        df = self.scenarios.get(name)
+        if df is None: return
+        logging.info(f"Активний сценарій: {name}")
+        self.close_stored_run()
+        self.active_scenario.set(name)
+        self.df = df
+        self.analytics = self.scenarios.get_analytics(name)
+        self.data_fingerprint = self.scenarios.get_fingerprint(name)
+        self.update_comparison(refresh=False)
+        self.refresh_all_tabs()
+
+    def update_comparison(self, refresh=True):
+        """Перераховує порівняння активного сценарію з обраним (лише дельта-масиви)"""
+        name = self.compare_with.get()
+        other = self.scenarios.get(name)
+        self.comparison = None
+        self.comparison_fingerprint = None
+        if other is not None and other is not self.df and self.df is not None:
+            try:
+                with instrumentation.tracker.span("comparison", len(self.df)):
+                    self.comparison = scenarios.Comparison(self.df, other, name)
+                self.comparison_fingerprint = self.scenarios.get_fingerprint(name)
+            except ValueError as e:
+                logging.warning(f"Порівняння неможливе: {e}")
+                messagebox.showwarning("Порівняння", str(e))
+        if refresh:
+            self.refresh_all_tabs()
+
+    def db_path(self):
+        """Файл SQLite-сховища у поточній папці результатів"""
+        return os.path.join(self.output_dir.get(), storage.DB_FILENAME)
+
+    def open_stored_run(self, run_id):
+        """Перегляд збереженого прогону: вкладки запитують лише потрібні зрізи"""
+        try:
+            run = storage.StoredRun(self.db_path(), run_id)
+        except Exception as e:
+            messagebox.showerror("SQLite", str(e))
+            return
+        self.close_stored_run()
+        logging.info(f"Відкрито прогін з SQLite: #{run_id} {run.name}")
+        self.stored_run = run
+        self.df = None
+        self.analytics = {}
+        self.comparison = None
+        self.data_fingerprint = pipeline.fingerprint('sqlite', run.db_path, run.run_id)
+        self.comparison_fingerprint = None
+        self.active_scenario.set("")
+        self.refresh_all_tabs()
+
+    def close_stored_run(self):
+        if self.stored_run is not None:
+            self.stored_run.close()
+            self.stored_run = None
 
     def on_close(self):
         logging.info("=== ЗАВЕРШЕННЯ РОБОТИ ===")
+        for tab in self.analysis_tabs:
+            tab.shutdown()
+        self.close_stored_run()
+        instrumentation.stop_queue_logging()
         self.root.destroy()
 
 if __name__ == "__main__":
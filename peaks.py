@@ -0,0 +1,144 @@
+import pandas as pd
+import numpy as np
+import logging
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Точки таблиці місячних кривих тривалості (годин на місяць, не більше 744)
+MONTHLY_DURATION_POINTS = (1, 10, 50, 100, 360, 720)
+
+
+def _segments(keys: np.ndarray):
+    """Межі суцільних відрізків однакового ключа (дані впорядковані за часом)."""
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    ends = np.append(starts[1:], len(keys))
+    return starts, ends
+
+
+def hours_per_sample(df: pd.DataFrame) -> float:
+    """Крок ряду в годинах (1.0 для погодинних, 0.25 для 15-хвилинних даних)."""
+    if len(df) < 2:
+        return 1.0
+    ts = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+    step = np.median(np.diff(ts[:1000]).astype(np.int64))
+    return float(step) / 3.6e12
+
+
+def top_n_peaks(df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    """
+    Топ-N пікових годин кожного року через np.argpartition (O(n) замість сортування).
+    Роки — суцільні зрізи-представлення одного масиву, без копій даних.
+    """
+    load = df['load_mw'].to_numpy()
+    years = df['year'].to_numpy()
+    picks = []
+    for lo, hi in zip(*_segments(years)):
+        part = load[lo:hi]
+        k = min(n, len(part))
+        top = np.argpartition(part, len(part) - k)[-k:]
+        # Сортуємо лише k обраних елементів
+        top = top[np.argsort(part[top])[::-1]]
+        picks.append(lo + top)
+
+    idx = np.concatenate(picks) if picks else np.empty(0, dtype=np.int64)
+    table = pd.DataFrame({
+        'year': years[idx],
+        'rank': np.concatenate([np.arange(1, len(p) + 1) for p in picks]) if picks else idx,
+        'timestamp': df['timestamp'].to_numpy()[idx],
+        'load_mw': load[idx],
+        'temperature_c': df['temperature_c'].to_numpy()[idx],
+    })
+    logger.info(f"Топ-{n} піків: {len(table)} записів по {len(picks)} роках")
+    return table
+
+
+def monthly_peaks(df: pd.DataFrame, annual_top: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Пік кожного місяця (коінцидентні піки): година, навантаження, температура,
+    потужність та резерв у момент піку. Argmax по відрізках без groupby.
+    """
+    load = df['load_mw'].to_numpy()
+    month_key = df['year'].to_numpy().astype(np.int32) * 12 + df['month'].to_numpy()
+    starts, ends = _segments(month_key)
+
+    seg_max = np.maximum.reduceat(load, starts)
+    seg_id = np.repeat(np.arange(len(starts)), ends - starts)
+    # Перша позиція, де значення дорівнює максимуму свого відрізка
+    hits = np.flatnonzero(load == seg_max[seg_id])
+    _, first = np.unique(seg_id[hits], return_index=True)
+    idx = hits[first]
+
+    capacity = df['capacity_mw'].to_numpy()[idx]
+    table = pd.DataFrame({
+        'year': df['year'].to_numpy()[idx],
+        'month': df['month'].to_numpy()[idx],
+        'timestamp': df['timestamp'].to_numpy()[idx],
+        'load_mw': load[idx],
+        'temperature_c': df['temperature_c'].to_numpy()[idx],
+        'capacity_mw': capacity,
+        'reserve_pct': ((capacity - load[idx]) / load[idx] * 100).round(1),
+    })
+    if annual_top is not None:
+        table['in_annual_top'] = table['timestamp'].isin(annual_top['timestamp'])
+    return table
+
+
+def duration_curves(df: pd.DataFrame, bin_mw: float = 10.0, monthly: bool = False):
+    """
+    Криві тривалості навантаження для кожного року (monthly=True — для кожного місяця)
+    з гістограми (без повного сортування).
+    Повертає (рівні МВт, DataFrame годин >= рівня: рядки — роки або (рік, місяць), колонки — рівні).
+    """
+    load = df['load_mw'].to_numpy()
+    step_h = hours_per_sample(df)
+    period_keys = df['year'].to_numpy()
+    if monthly:
+        # Складений ключ (рік, місяць) -> одне ціле число
+        period_keys = period_keys.astype(np.int64) * 100 + df['month'].to_numpy()
+
+    lo = np.floor(np.nanmin(load) / bin_mw) * bin_mw
+    hi = np.ceil(np.nanmax(load) / bin_mw) * bin_mw + bin_mw
+    levels = np.arange(lo, hi, bin_mw)
+    n_bins = len(levels)
+
+    period_ids, period_idx = np.unique(period_keys, return_inverse=True)
+    bins = np.clip(((load - lo) // bin_mw).astype(np.int64), 0, n_bins - 1)
+    # Одна гістограма на всі періоди: 2D індекс (період, кошик) -> bincount
+    counts = np.bincount(period_idx * n_bins + bins, minlength=len(period_ids) * n_bins)
+    counts = counts.reshape(len(period_ids), n_bins)
+    # Годин з навантаженням >= рівня: кумулятивна сума "згори"
+    exceed = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1] * step_h
+
+    if monthly:
+        index = pd.MultiIndex.from_arrays([period_ids // 100, period_ids % 100], names=['year', 'month'])
+    else:
+        index = pd.Index(period_ids, name='year')
+    curves = pd.DataFrame(exceed, index=index, columns=levels)
+    return levels, curves
+
+
+def duration_curve_table(curves: pd.DataFrame, points=(1, 10, 50, 100, 500, 1000, 4380, 8760)) -> pd.DataFrame:
+    """Навантаження, яке перевищується протягом заданої кількості годин за період (рядок curves)."""
+    levels = curves.columns.to_numpy()
+    values = curves.to_numpy()
+    # exceed спадає зі зростанням рівня: найвищий рівень з exceed >= h — кількість рівнів з exceed >= h мінус 1
+    pos = (values[:, :, None] >= np.asarray(points, dtype=float)).sum(axis=1) - 1
+    table = np.where(pos >= 0, levels[np.clip(pos, 0, len(levels) - 1)], np.nan)
+    return pd.DataFrame(table, index=curves.index, columns=[f'{h} год' for h in points])
+
+
+def compute_peak_analytics(df: pd.DataFrame, n: int = 10) -> dict:
+    """Всі пікові таблиці для вкладки та звіту."""
+    top = top_n_peaks(df, n)
+    levels, curves = duration_curves(df)
+    _, monthly_curves = duration_curves(df, monthly=True)
+    return {
+        'top': top,
+        'monthly': monthly_peaks(df, top),
+        'levels': levels,
+        'curves': curves,
+        'duration_table': duration_curve_table(curves),
+        'monthly_curves': monthly_curves,
+        'monthly_duration_table': duration_curve_table(monthly_curves, MONTHLY_DURATION_POINTS),
+    }
@@ -0,0 +1,127 @@
+import hashlib
+import logging
+import pandas as pd
+
+import instrumentation
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(*parts) -> str:
+    """Короткий відбиток входів (repr простих значень: параметри та відбитки попередніх етапів)."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:12]
+
+
+class Stage:
+    """
+    Етап конвеєра: func(*виходи_залежностей, **параметри).
+    check(output) повертає причину перезапуску, якщо збережений результат більше
+    не дійсний (наприклад, файл звіту видалено), або None.
+    """
+
+    def __init__(self, name: str, func, deps=(), params=(), check=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = tuple(params)
+        self.check = check
+
+
+class Pipeline:
+    """
+    Невеликий DAG етапів з мемоізацією за відбитками входів.
+
+    Відбиток етапу — хеш його параметрів та відбитків залежностей (дані не хешуються),
+    тож перевірка коштує мікросекунди. Для кожного етапу зберігається лише останній
+    результат: пам'ять не росте, а повторний запуск з тими ж параметрами нічого не рахує.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._memo = {}  # назва -> {'fingerprint', 'params', 'deps', 'output'}
+        self.last_run = {'executed': [], 'skipped': [], 'fingerprints': {}}
+
+    def add(self, name: str, func, deps=(), params=(), check=None):
+        """Додає етап; залежності мають бути додані раніше (порядок додавання — топологічний)."""
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Етап '{name}': невідомі залежності {missing}")
+        self.stages[name] = Stage(name, func, deps, params, check)
+        return self
+
+    def invalidate(self, name: str = None):
+        """Скидає збережений результат етапу (або всіх етапів)."""
+        if name is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(name, None)
+
+    def _required(self, targets):
+        if targets is None:
+            return list(self.stages)
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.stages[name].deps)
+        return [name for name in self.stages if name in needed]
+
+    def _rerun_reason(self, stage: Stage, fp: str, params: dict, dep_fps: dict):
+        memo = self._memo.get(stage.name)
+        if memo is None:
+            return "перший запуск"
+        if memo['fingerprint'] == fp:
+            return stage.check(memo['output']) if stage.check else None
+        changed = [k for k in params if memo['params'].get(k) != params[k]]
+        if changed:
+            return f"змінились параметри: {', '.join(changed)}"
+        changed = [d for d in dep_fps if memo['deps'].get(d) != dep_fps[d]]
+        return f"змінились входи: {', '.join(changed)}"
+
+    def run(self, context: dict, targets=None, on_stage=None) -> dict:
+        """
+        Виконує потрібні етапи з context (параметри за назвами).
+        Етап перезапускається лише тоді, коли змінились його параметри або вихід залежності;
+        інакше повертається збережений результат. on_stage(назва, номер, всього) — для прогресу.
+        Повертає {назва етапу: вихід}.
+        """
+        order = self._required(targets)
+        outputs, fps = {}, {}
+        executed, skipped = [], []
+        tracker = instrumentation.tracker
+
+        for i, name in enumerate(order):
+            stage = self.stages[name]
+            params = {k: context[k] for k in stage.params}
+            dep_fps = {d: fps[d] for d in stage.deps}
+            fp = fingerprint(name, sorted(params.items()), sorted(dep_fps.items()))
+            reason = self._rerun_reason(stage, fp, params, dep_fps)
+
+            if reason is None:
+                outputs[name] = self._memo[name]['output']
+                skipped.append(name)
+                logger.info(f"Етап '{name}': пропущено — входи не змінились ({fp})")
+            else:
+                if on_stage is not None:
+                    on_stage(name, i, len(order))
+                logger.info(f"Етап '{name}': виконується — {reason}")
+                inputs = [outputs[d] for d in stage.deps]
+                rows = next((len(x) for x in inputs if isinstance(x, pd.DataFrame)), None)
+                with tracker.span(name, rows) as s:
+                    output = stage.func(*inputs, **params)
+                    if isinstance(output, pd.DataFrame):
+                        s.rows = len(output)
+                self._memo[name] = {'fingerprint': fp, 'params': params, 'deps': dep_fps, 'output': output}
+                outputs[name] = output
+                executed.append(name)
+            fps[name] = fp
+
+        self.last_run = {'executed': executed, 'skipped': skipped, 'fingerprints': fps}
+        logger.info(f"Конвеєр: виконано {executed or '—'}, пропущено {skipped or '—'}")
+        return outputs
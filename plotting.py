@@ -10,7 +10,8 @@ THEME = {
     'line_secondary': '#00e676', # Green
     'line_tertiary': '#ff2a68',  # Red/Pink
     'scatter': '#ffea00',        # Yellow
-    'fill': '#00e5ff'
+    'fill': '#00e5ff',
+    'anomaly': '#ff1744'         # Red
 }
 
 def setup_chart_style(ax, title, xlabel, ylabel):
@@ -33,8 +34,17 @@ def setup_chart_style(ax, title, xlabel, ylabel):
     ax.spines['bottom'].set_color(THEME['grid'])
     ax.spines['left'].set_color(THEME['grid'])
 
-def plot_hourly_dashboard(fig, day_data, selected_date):
-    """Малює ДВА графіки: Часовий ряд та Кореляцію"""
+def plot_anomaly_markers(ax, x, y, label='Аномалії'):
+    """Червоні маркери знайдених аномалій поверх графіка"""
+    if len(x) == 0: return
+    ax.scatter(x, y, color=THEME['anomaly'], marker='x', s=60, linewidth=2, zorder=5, label=label)
+
+def plot_hourly_dashboard(fig, day_data, selected_date, anomalies=None, trend_coeffs=None, compare=None):
+    """
+    Малює ДВА графіки: Часовий ряд та Кореляцію.
+    trend_coeffs — (a, b, c) з таблиці температурної чутливості для цього дня.
+    compare — (назва, значення) іншого сценарію для тих самих годин.
+    """
     ax1 = fig.add_subplot(211) # Верхній графік
     ax2 = fig.add_subplot(212) # Нижній графік
     
@@ -44,6 +54,12 @@ def plot_hourly_dashboard(fig, day_data, selected_date):
     
     ax1.plot(hours, load, color=THEME['line_primary'], linewidth=2, label='Навантаження')
     ax1.fill_between(hours, load, alpha=0.15, color=THEME['fill'])
+    if compare is not None:
+        ax1.plot(hours, compare[1], color=THEME['scatter'], linewidth=1.5, linestyle='--', label=compare[0])
+    if anomalies is not None and not anomalies.empty:
+        plot_anomaly_markers(ax1, anomalies['timestamp'].dt.hour, anomalies['load_mw'])
+    if compare is not None or (anomalies is not None and not anomalies.empty):
+        ax1.legend(facecolor=THEME['bg'], edgecolor=THEME['grid'], labelcolor=THEME['fg'], fontsize=8)
     
     setup_chart_style(ax1, f'Профіль: {selected_date}', 'Година', 'МВт')
     ax1.set_xlim(0, 23)
@@ -55,21 +71,22 @@ def plot_hourly_dashboard(fig, day_data, selected_date):
     # Малюємо точки
     scatter = ax2.scatter(temp, load, color=THEME['scatter'], alpha=0.7, s=40, edgecolors='black', linewidth=0.5)
     
-    # Лінія тренду (поліноміальна регресія для краси)
-    try:
-        z = np.polyfit(temp, load, 2) # Квадратична залежність
-        p = np.poly1d(z)
+    # Лінія тренду (квадратична модель, вже порахована пакетно для всіх днів)
+    if trend_coeffs is not None and np.all(np.isfinite(trend_coeffs)) and len(temp) > 0:
+        a, b, c = trend_coeffs
         xp = np.linspace(temp.min(), temp.max(), 100)
-        ax2.plot(xp, p(xp), color=THEME['line_tertiary'], linestyle='--', alpha=0.8, label='Тренд')
-    except: pass
+        ax2.plot(xp, a + b * xp + c * xp ** 2, color=THEME['line_tertiary'], linestyle='--', alpha=0.8, label='Тренд')
+        ax2.legend(facecolor=THEME['bg'], edgecolor=THEME['grid'], labelcolor=THEME['fg'], fontsize=8)
 
     setup_chart_style(ax2, 'Аналіз залежності: Температура vs Навантаження', 'Температура (°C)', 'Навантаження (МВт)')
-    ax2.legend(facecolor=THEME['bg'], edgecolor=THEME['grid'], labelcolor=THEME['fg'], fontsize=8)
 
     fig.tight_layout(pad=2.0)
 
-def plot_monthly_dashboard(fig, monthly_stats, year):
-    """Малює ДВА графіки: Динаміку та BoxPlot (Розподіл)"""
+def plot_monthly_dashboard(fig, monthly_stats, year, anomalies=None, compare=None):
+    """
+    Малює ДВА графіки: Динаміку та BoxPlot (Розподіл).
+    compare — (назва, DataFrame з other_peak/other_mean у порядку рядків monthly_stats).
+    """
     ax1 = fig.add_subplot(211)
     ax2 = fig.add_subplot(212)
     
@@ -82,6 +99,14 @@ def plot_monthly_dashboard(fig, monthly_stats, year):
     ax1.plot(x, monthly_stats['min_load'], color=THEME['line_primary'], marker='.', label='Мін')
     
     ax1.fill_between(x, monthly_stats['min_load'], monthly_stats['max_load'], alpha=0.1, color='gray')
+    if anomalies is not None and not anomalies.empty:
+        # Позиція місяця на осі X відповідає порядку рядків monthly_stats
+        month_pos = {m: i for i, m in enumerate(monthly_stats.index.get_level_values('month'))}
+        ev_x = anomalies['timestamp'].dt.month.map(month_pos)
+        plot_anomaly_markers(ax1, ev_x, anomalies['load_mw'])
+    if compare is not None:
+        ax1.plot(x, compare[1]['other_peak'], color=THEME['line_tertiary'], linestyle='--', alpha=0.7, label=f'Макс ({compare[0]})')
+        ax1.plot(x, compare[1]['other_mean'], color=THEME['line_secondary'], linestyle='--', alpha=0.7, label=f'Серед ({compare[0]})')
     
     setup_chart_style(ax1, f'Моніторинг ({year})', 'Місяць', 'МВт')
     ax1.set_xticks(x)
@@ -104,11 +129,15 @@ def plot_monthly_dashboard(fig, monthly_stats, year):
     
     fig.tight_layout(pad=2.0)
 
-def plot_daily_consumption(ax, daily_stats, year, month_name):
+def plot_daily_consumption(ax, daily_stats, year, month_name, compare=None):
+    """compare — (назва, добові суми іншого сценарію в порядку рядків daily_stats)"""
     ax.clear()
     dates = [str(date)[-2:] for date, _ in daily_stats.index]
     ax.bar(dates, daily_stats['total_energy'], color=THEME['line_primary'], alpha=0.7)
     setup_chart_style(ax, f'Споживання: {month_name} {year}', 'День', 'МВт·год')
+    if compare is not None:
+        ax.plot(dates, compare[1], color=THEME['scatter'], marker='o', markersize=3, linewidth=1.5, label=compare[0])
+        ax.legend(facecolor=THEME['bg'], edgecolor=THEME['grid'], labelcolor=THEME['fg'], fontsize=8)
     
     n = len(dates)
     if n > 0:
@@ -138,3 +167,134 @@ def plot_monthly_consumption(ax, stats):
     ax.set_xticks(x)
     ax.set_xticklabels(months_ukr)
     ax.legend(facecolor=THEME['bg'], edgecolor=THEME['grid'], labelcolor=THEME['fg'])
+
+def plot_anomaly_timeline(fig, year_data, anomalies, year):
+    """Річний ряд навантаження з позначеними аномаліями та їх z-оцінками"""
+    ax1 = fig.add_subplot(211)
+    ax2 = fig.add_subplot(212, sharex=ax1)
+
+    ax1.plot(year_data['timestamp'], year_data['load_mw'], color=THEME['line_primary'], linewidth=0.5, alpha=0.8)
+    plot_anomaly_markers(ax1, anomalies['timestamp'], anomalies['load_mw'])
+    setup_chart_style(ax1, f'Аномалії навантаження ({year})', '', 'МВт')
+
+    colors = np.where(anomalies['z_score'] > 0, THEME['line_tertiary'], THEME['line_primary'])
+    ax2.vlines(anomalies['timestamp'], 0, anomalies['z_score'], colors=colors, linewidth=2)
+    ax2.axhline(0, color=THEME['grid'])
+    setup_chart_style(ax2, 'Робастна z-оцінка (відхилення від профілю години тижня)', 'Дата', 'z')
+
+    fig.autofmt_xdate()
+    fig.tight_layout(pad=2.0)
+
+def plot_sensitivity_trend(fig, table, period_label):
+    """Динаміка температурної чутливості (МВт/°C) та якості моделі (R²) по періодах"""
+    ax1 = fig.add_subplot(211)
+    ax2 = fig.add_subplot(212)
+
+    x = table.index
+    ax1.plot(x, table['sensitivity'], color=THEME['line_primary'], linewidth=1, alpha=0.6, label='dLoad/dT')
+    if len(table) > 10:
+        # Згладжування для читабельності на довгих періодах
+        window = max(len(table) // 50, 3)
+        smooth = table['sensitivity'].rolling(window, center=True, min_periods=1).mean()
+        ax1.plot(x, smooth, color=THEME['line_tertiary'], linewidth=2, label='Згладжено')
+    ax1.axhline(0, color=THEME['grid'])
+    setup_chart_style(ax1, f'Температурна чутливість ({period_label})', '', 'МВт/°C')
+    ax1.legend(facecolor=THEME['bg'], edgecolor=THEME['grid'], labelcolor=THEME['fg'], fontsize=8)
+
+    ax2.scatter(table['temp_mean'], table['sensitivity'], c=table['r2'], cmap='viridis', s=8, alpha=0.7)
+    setup_chart_style(ax2, 'Чутливість vs середня температура (колір — R²)', 'Температура (°C)', 'МВт/°C')
+
+    fig.tight_layout(pad=2.0)
+
+def plot_peak_dashboard(fig, levels, curves, year, top_peaks, month=None):
+    """
+    Крива тривалості навантаження (обраний рік на тлі інших) та топ-N пікових годин.
+    month — curves містить місячні криві (індекс рік, місяць): обраний місяць на тлі інших місяців року.
+    """
+    ax1 = fig.add_subplot(211)
+    ax2 = fig.add_subplot(212)
+
+    if month is not None:
+        curves = curves.xs(year, level='year') if year in curves.index.get_level_values('year') else curves.iloc[:0]
+        key, label, period = month, f'{month:02d}.{year}', 'місяць'
+    else:
+        key, label, period = year, str(year), 'рік'
+
+    # Інші роки (місяці) — тонкими лініями (не більше 10 для читабельності)
+    others = [k for k in curves.index if k != key]
+    for k in others[-10:]:
+        ax1.plot(curves.loc[k].to_numpy(), levels, color=THEME['grid'], linewidth=0.8, alpha=0.8)
+    if key in curves.index:
+        ax1.plot(curves.loc[key].to_numpy(), levels, color=THEME['line_primary'], linewidth=2, label=label)
+    setup_chart_style(ax1, 'Крива тривалості навантаження', f'Годин на {period} з навантаженням ≥ рівня', 'МВт')
+    ax1.legend(facecolor=THEME['bg'], edgecolor=THEME['grid'], labelcolor=THEME['fg'], fontsize=8)
+
+    labels = [t.strftime('%m-%d %H') for t in top_peaks['timestamp']]
+    x = np.arange(len(labels))
+    ax2.bar(x, top_peaks['load_mw'], color=THEME['line_tertiary'], alpha=0.7)
+    setup_chart_style(ax2, f'Топ-{len(labels)} пікових годин ({year})', 'Година піку', 'МВт')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(labels, rotation=30, fontsize=7)
+    if len(labels):
+        ax2.set_ylim(top_peaks['load_mw'].min() * 0.95, top_peaks['load_mw'].max() * 1.02)
+
+    fig.tight_layout(pad=2.0)
+
+def plot_reserve_dashboard(fig, daily_margin, events, monthly, threshold_pct, year):
+    """Денний мінімальний резерв з епізодами низького резерву та їх тривалість по місяцях"""
+    ax1 = fig.add_subplot(211)
+    ax2 = fig.add_subplot(212)
+
+    ax1.plot(daily_margin.index, daily_margin.values, color=THEME['line_secondary'], linewidth=1, label='Мін. резерв за добу')
+    ax1.axhline(threshold_pct, color=THEME['scatter'], linestyle='--', linewidth=1, label=f'Поріг {threshold_pct:g}%')
+    ax1.axhline(0, color=THEME['anomaly'], linewidth=1)
+    plot_anomaly_markers(ax1, events['start'], events['min_margin_pct'], label='Епізоди')
+    setup_chart_style(ax1, f'Резерв потужності ({year})', 'Дата', '% від навантаження')
+    ax1.legend(facecolor=THEME['bg'], edgecolor=THEME['grid'], labelcolor=THEME['fg'], fontsize=8)
+    ax1.tick_params(axis='x', labelrotation=20)
+
+    months_ukr = ['Січ', 'Лют', 'Бер', 'Кві', 'Тра', 'Чер', 'Лип', 'Сер', 'Вер', 'Жов', 'Лис', 'Гру']
+    hours = np.zeros(12)
+    if not monthly.empty:
+        hours[monthly['month'].to_numpy() - 1] = monthly['hours'].to_numpy()
+    ax2.bar(np.arange(12), hours, color=THEME['line_tertiary'], alpha=0.7)
+    setup_chart_style(ax2, 'Години з низьким резервом / дефіцитом', 'Місяць', 'Годин')
+    ax2.set_xticks(np.arange(12))
+    ax2.set_xticklabels(months_ukr)
+
+    fig.tight_layout(pad=2.0)
+
+def plot_spectral_dashboard(fig, result, n_peaks=10):
+    """Амплітудний спектр за періодами, профіль години тижня та тренд"""
+    ax1 = fig.add_subplot(311)
+    ax2 = fig.add_subplot(312)
+    ax3 = fig.add_subplot(313)
+
+    freqs, amplitude = result['freqs'][1:], result['amplitude'][1:]
+    periods = 1 / freqs
+    # Періоди, що вкладаються в ряд менше двох разів, — це вже тренд, а не цикл
+    keep = periods <= periods[0] / 2
+    periods, amplitude = periods[keep], amplitude[keep]
+    ax1.plot(periods, amplitude, color=THEME['line_primary'], linewidth=0.8)
+    ax1.set_xscale('log')
+    top = result['peaks'].head(n_peaks)
+    ax1.scatter(top['period_h'], top['amplitude_mw'], color=THEME['scatter'], s=20, zorder=5)
+    for _, r in top.head(5).iterrows():
+        ax1.annotate(r['period'], (r['period_h'], r['amplitude_mw']), color=THEME['fg'], fontsize=7,
+                     xytext=(3, 3), textcoords='offset points')
+    method = 'rfft' if result['segments'] == 1 else f"Велч, {result['segments']} сегм."
+    setup_chart_style(ax1, f'Амплітудний спектр ({method})', 'Період, год', 'МВт')
+
+    profile = result['profile']
+    ax2.plot(np.arange(len(profile)), profile, color=THEME['line_secondary'], linewidth=1.2)
+    for day in range(24, len(profile), 24):
+        ax2.axvline(day, color=THEME['grid'], linewidth=0.8)
+    ax2.set_xticks(np.arange(12, len(profile), 24))
+    ax2.set_xticklabels(['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Нд'])
+    setup_chart_style(ax2, f"Сезонність (година тижня), сила {result['seasonal_strength']:.2f}", '', 'МВт')
+
+    trend = result['trend_daily']
+    ax3.plot(trend.index, trend.values, color=THEME['line_tertiary'], linewidth=1)
+    setup_chart_style(ax3, f"Тренд (тижневе ковзне середнє), сила {result['trend_strength']:.2f}", 'Дата', 'МВт')
+
+    fig.tight_layout(pad=2.0)
@@ -0,0 +1,36 @@
+import pandas as pd
+
+# Агрегати вкладок аналізу без залежності від Tk:
+# спільні для ui_analysis.py та HTTP-сервісу (server.py)
+
+DAY_PROFILE_COLUMNS = ['timestamp', 'hour', 'load_mw', 'temperature_c', 'capacity_mw']
+
+
+def day_profile(data: pd.DataFrame) -> pd.DataFrame:
+    """Погодинний профіль дня (зріз підготовлених даних за одну дату)."""
+    return data[DAY_PROFILE_COLUMNS]
+
+
+def monthly_stats(data: pd.DataFrame) -> pd.DataFrame:
+    """Макс/мін/середнє та сума по місяцях року (вкладка "Місячний звіт")."""
+    stats = data.groupby(['month', 'month_name']).agg({
+        'load_mw': ['max', 'min', 'mean', 'sum']
+    }).round(1)
+    stats.columns = ['max_load', 'min_load', 'avg_load', 'total_consumption']
+    return stats.sort_index(level='month')
+
+
+def daily_stats(data: pd.DataFrame) -> pd.DataFrame:
+    """Добове споживання, середнє та максимум по днях місяця (вкладка "Добове споживання")."""
+    stats = data.groupby(['date', 'day_type']).agg({'load_mw': ['sum', 'mean', 'max']}).round(1)
+    stats.columns = ['total_energy', 'avg_load', 'max_load']
+    return stats
+
+
+def yearly_comparison(df: pd.DataFrame) -> pd.DataFrame:
+    """Місячні суми по всіх роках для порівняння років (вкладка "Річна статистика")."""
+    stats = df.groupby(['year', 'month_name', 'month']).agg({
+        'load_mw': ['sum', 'mean', 'max'], 'date': 'nunique'
+    }).round(1)
+    stats.columns = ['total_energy', 'avg_load', 'max_load', 'days_count']
+    return stats.sort_index(level=['year', 'month'])
@@ -0,0 +1,85 @@
+import pandas as pd
+import numpy as np
+import logging
+
+from peaks import hours_per_sample
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+
+def reserve_margin(df: pd.DataFrame):
+    """Резерв потужності (МВт та % від навантаження) для всього ряду."""
+    load = df['load_mw'].to_numpy(dtype=np.float32)
+    margin = df['capacity_mw'].to_numpy(dtype=np.float32) - load
+    margin_pct = margin / np.maximum(load, 1) * 100
+    return margin, margin_pct
+
+
+def run_lengths(mask: np.ndarray):
+    """Run-length encoding булевої маски: (початки, кінці) суцільних відрізків True."""
+    edges = np.diff(np.concatenate([[0], mask.view(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return starts, ends
+
+
+def detect_reserve_events(df: pd.DataFrame, low_margin_pct: float = 12.0) -> pd.DataFrame:
+    """
+    Суцільні епізоди дефіциту (резерв < 0) або низького резерву (< low_margin_pct %).
+    Повертає таблицю подій: початок, тривалість (год), глибина (мінімальний резерв).
+    """
+    margin, margin_pct = reserve_margin(df)
+    mask = np.nan_to_num(margin_pct, nan=np.inf) < low_margin_pct
+    starts, ends = run_lengths(mask)
+
+    if len(starts):
+        # Мінімум на кожному відрізку [start, end): reduceat по парах меж
+        bounds = np.ravel(np.column_stack([starts, ends]))
+        padded = np.append(margin, np.inf)
+        depth = np.minimum.reduceat(padded, bounds)[::2]
+        depth_pct = np.minimum.reduceat(np.append(margin_pct, np.inf), bounds)[::2]
+    else:
+        depth = depth_pct = np.empty(0, dtype=np.float32)
+
+    ts = df['timestamp'].to_numpy()
+    step_h = hours_per_sample(df)
+    events = pd.DataFrame({
+        'start': ts[starts],
+        'end': ts[np.maximum(ends - 1, 0)] if len(ends) else ts[:0],
+        'duration_h': (ends - starts) * step_h,
+        'min_margin_mw': depth.round(1),
+        'min_margin_pct': depth_pct.round(1),
+        'kind': np.where(depth < 0, 'Дефіцит', 'Низький резерв'),
+    })
+    events['year'] = events['start'].dt.year
+    events['month'] = events['start'].dt.month
+    logger.info(f"Резерв: {len(events)} епізодів з резервом < {low_margin_pct}% "
+                f"({int((depth < 0).sum())} дефіцитів)")
+    return events
+
+
+def summarize_events(events: pd.DataFrame, by=('year', 'month')) -> pd.DataFrame:
+    """Статистика епізодів по місяцях або роках."""
+    by = list(by)
+    if events.empty:
+        return pd.DataFrame(columns=by + ['events', 'deficits', 'hours', 'max_duration_h', 'min_margin_mw'])
+    stats = events.assign(is_deficit=events['min_margin_mw'] < 0).groupby(by).agg(
+        events=('duration_h', 'size'),
+        deficits=('is_deficit', 'sum'),
+        hours=('duration_h', 'sum'),
+        max_duration_h=('duration_h', 'max'),
+        min_margin_mw=('min_margin_mw', 'min'),
+    )
+    return stats.reset_index()
+
+
+def compute_reserve_analytics(df: pd.DataFrame, low_margin_pct: float = 12.0) -> dict:
+    """Епізоди та зведення по місяцях і роках для вкладки та звіту."""
+    events = detect_reserve_events(df, low_margin_pct)
+    return {
+        'threshold_pct': low_margin_pct,
+        'events': events,
+        'monthly': summarize_events(events, ('year', 'month')),
+        'yearly': summarize_events(events, ('year',)),
+    }
@@ -0,0 +1,140 @@
+import itertools
+import pandas as pd
+import numpy as np
+import logging
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Пункт списку "Порівняти з" для вимкненого порівняння
+NO_COMPARISON = "— без порівняння —"
+
+
+class ScenarioStore:
+    """
+    Набір іменованих датасетів (сценаріїв) застосунку.
+    Кожен запис — підготовлений DataFrame, результати аналітики та відбиток даних
+    (від чого їх отримано: параметри конвеєра, файл імпорту); нічого не копіюється.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._serial = itertools.count(1)
+
+    def add(self, name: str, df: pd.DataFrame, analytics: dict = None, fingerprint: str = None) -> str:
+        """Додає датасет; за збігу імені додає суфікс (#2, #3 ...). Повертає фінальне ім'я."""
+        final, k = name, 2
+        while final in self._items:
+            final, k = f"{name} #{k}", k + 1
+        # Без відомого походження — унікальний відбиток, що не повторюється за час роботи
+        self._items[final] = (df, analytics or {}, fingerprint or f"scenario-{next(self._serial)}")
+        logger.info(f"Сценарій додано: {final} ({len(df)} записів)")
+        return final
+
+    def get(self, name: str):
+        return self._items.get(name, (None, None, None))[0]
+
+    def get_analytics(self, name: str) -> dict:
+        return self._items.get(name, (None, {}, None))[1]
+
+    def get_fingerprint(self, name: str):
+        return self._items.get(name, (None, {}, None))[2]
+
+    def remove(self, name: str):
+        self._items.pop(name, None)
+
+    def names(self):
+        return list(self._items)
+
+    def find(self, fingerprint: str):
+        """Ім'я сценарію з таким відбитком даних або None."""
+        for name, (_, _, item) in self._items.items():
+            if item == fingerprint:
+                return name
+        return None
+
+
+def _hour_numbers(df: pd.DataFrame) -> np.ndarray:
+    return df['timestamp'].to_numpy(dtype='datetime64[h]').astype(np.int64)
+
+
+def align(base: pd.DataFrame, other: pd.DataFrame):
+    """
+    Вирівнювання двох безперервних погодинних рядів цілим зсувом.
+    Повертає (base_slice, other_slice) — зрізи спільного періоду, або None, якщо перетину немає.
+    """
+    hb, ho = _hour_numbers(base), _hour_numbers(other)
+    for h, label in ((hb, 'базовий'), (ho, 'порівнюваний')):
+        if len(h) and h[-1] - h[0] != len(h) - 1:
+            raise ValueError(f"{label} ряд не є безперервним погодинним")
+
+    offset = int(ho[0] - hb[0])  # позиція початку other у координатах base
+    lo = max(0, offset)
+    hi = min(len(hb), offset + len(ho))
+    if hi <= lo:
+        return None
+    return slice(lo, hi), slice(lo - offset, hi - offset)
+
+
+class Comparison:
+    """
+    Порівняння сценарію з базовим: дельта-ряд та дельта-зведення.
+    Зберігаються лише зрізи-представлення та нові дельта-масиви.
+    """
+
+    def __init__(self, base: pd.DataFrame, other: pd.DataFrame, other_name: str):
+        self.base = base
+        self.other = other
+        self.name = other_name
+        aligned = align(base, other)
+        if aligned is None:
+            raise ValueError("Сценарії не мають спільного періоду")
+        self.base_slice, self.other_slice = aligned
+        self.offset = self.base_slice.start - self.other_slice.start
+
+        base_load = base['load_mw'].to_numpy()[self.base_slice]
+        other_load = other['load_mw'].to_numpy()[self.other_slice]
+        self.delta = other_load - base_load
+        self.daily = self._rollup(base_load, other_load, 'D')
+        self.monthly = self._rollup(base_load, other_load, 'M')
+        logger.info(f"Порівняння з '{other_name}': {len(self.delta)} спільних годин, "
+                    f"зсув {self.offset}, Δ сер. {self.delta.mean():+.1f} МВт")
+
+    def _rollup(self, base_load, other_load, unit):
+        """Суми та піки по днях/місяцях через reduceat на межах відрізків (без groupby/merge)."""
+        ts = self.base['timestamp'].to_numpy()[self.base_slice]
+        keys = ts.astype(f'datetime64[{unit}]')
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        counts = np.diff(np.append(starts, len(keys)))
+
+        base_total = np.add.reduceat(base_load, starts, dtype=np.float64)
+        other_total = np.add.reduceat(other_load, starts, dtype=np.float64)
+        base_peak = np.maximum.reduceat(base_load, starts)
+        other_peak = np.maximum.reduceat(other_load, starts)
+
+        index = pd.DatetimeIndex(keys[starts].astype('datetime64[ns]'), name='period')
+        return pd.DataFrame({
+            'base_total': base_total.round(1),
+            'other_total': other_total.round(1),
+            'delta_total': (other_total - base_total).round(1),
+            'base_mean': (base_total / counts).round(1),
+            'other_mean': (other_total / counts).round(1),
+            'base_peak': base_peak,
+            'other_peak': other_peak,
+            'delta_peak': other_peak - base_peak,
+        }, index=index)
+
+    def other_rows(self, base_positions: np.ndarray, column: str = 'load_mw') -> np.ndarray:
+        """
+        Значення порівнюваного сценарію для позицій базового ряду (NaN поза перетином).
+        Суцільний діапазон позицій повертається як зріз-представлення без копії.
+        """
+        base_positions = np.asarray(base_positions)
+        values = self.other[column].to_numpy()
+        other_pos = base_positions - self.offset
+        inside = (other_pos >= 0) & (other_pos < len(values))
+        if len(other_pos) and inside.all() and other_pos[-1] - other_pos[0] == len(other_pos) - 1:
+            return values[other_pos[0]:other_pos[-1] + 1]
+        result = np.full(len(base_positions), np.nan, dtype=np.float64)
+        result[inside] = values[other_pos[inside]]
+        return result
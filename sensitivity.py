@@ -0,0 +1,91 @@
+import pandas as pd
+import numpy as np
+import logging
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+PERIODS = {'D': 'День', 'W': 'Тиждень', 'M': 'Місяць'}
+
+
+def period_keys(timestamps: pd.Series, period: str) -> np.ndarray:
+    """Початок періоду (день / тиждень з понеділка / місяць) для кожного запису."""
+    ts = timestamps.to_numpy(dtype='datetime64[ns]')
+    if period == 'D':
+        return ts.astype('datetime64[D]')
+    if period == 'W':
+        days = ts.astype('datetime64[D]').astype(np.int64)
+        # 1970-01-01 — четвер: зсув +3 дає тижні, що починаються з понеділка
+        return ((days + 3) // 7 * 7 - 3).astype('datetime64[D]')
+    if period == 'M':
+        return ts.astype('datetime64[M]').astype('datetime64[D]')
+    raise ValueError(f"Невідомий період: {period}")
+
+
+def fit_temperature_sensitivity(df: pd.DataFrame, period: str = 'D') -> pd.DataFrame:
+    """
+    Квадратична модель load = a + b*T + c*T^2 для КОЖНОГО періоду одним пакетним розв'язком.
+
+    Суми нормальних рівнянь для всіх груп рахуються через np.bincount, далі
+    стек 3x3 систем розв'язується однією операцією np.linalg.solve (мікро-регуляризація
+    робить стійкими групи зі сталою температурою). Температура центрується
+    всередині групи для числової стійкості, коефіцієнти повертаються у шкалі °C.
+    """
+    keys = period_keys(df['timestamp'], period)
+    if len(keys) and (keys[1:] >= keys[:-1]).all():
+        # Дані впорядковані за часом — групи визначаються точками зміни ключа (без сортування)
+        change = np.concatenate([[True], keys[1:] != keys[:-1]])
+        starts, group = keys[change], np.cumsum(change) - 1
+    else:
+        starts, group = np.unique(keys, return_inverse=True)
+    n_groups = len(starts)
+
+    temp = df['temperature_c'].to_numpy(dtype=np.float64)
+    load = df['load_mw'].to_numpy(dtype=np.float64)
+    valid = np.isfinite(temp) & np.isfinite(load)
+    group, temp, load = group[valid], temp[valid], load[valid]
+
+    count = np.bincount(group, minlength=n_groups).astype(np.float64)
+    temp_mean = np.bincount(group, weights=temp, minlength=n_groups) / np.maximum(count, 1)
+    t = temp - temp_mean[group]
+
+    # Моменти Σt^k (k=0..4) та Σy*t^k (k=0..2) для кожної групи
+    t_pow = [np.ones_like(t), t, t * t, t * t * t, (t * t) ** 2]
+    s = np.stack([np.bincount(group, weights=p, minlength=n_groups) for p in t_pow], axis=1)
+    r = np.stack([np.bincount(group, weights=load * p, minlength=n_groups) for p in t_pow[:3]], axis=1)
+    yy = np.bincount(group, weights=load * load, minlength=n_groups)
+
+    xtx = np.stack([s[:, 0:3], s[:, 1:4], s[:, 2:5]], axis=1)
+    xtx[:, [1, 2], [1, 2]] += 1e-6
+    xtx[:, 0, 0] = np.maximum(xtx[:, 0, 0], 1)  # порожні групи
+    beta = np.linalg.solve(xtx, r[:, :, None])[:, :, 0]
+    a0, b0, c = beta[:, 0], beta[:, 1], beta[:, 2]
+
+    ss_res = yy - np.einsum('gi,gi->g', beta, r)
+    ss_tot = yy - r[:, 0] ** 2 / np.maximum(count, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
+
+    # Повернення від центрованої температури до шкали °C
+    m = temp_mean
+    result = pd.DataFrame({
+        'a': a0 - b0 * m + c * m * m,
+        'b': b0 - 2 * c * m,
+        'c': c,
+        'r2': np.clip(r2, 0, 1),
+        'n': count.astype(np.int32),
+        'temp_mean': m,
+        # Чутливість dLoad/dT у середній температурі періоду (МВт/°C)
+        'sensitivity': b0,
+    }, index=pd.DatetimeIndex(starts, name='period_start'))
+
+    # Менше трьох точок — модель не визначена
+    result.loc[result['n'] < 3, ['a', 'b', 'c', 'r2', 'sensitivity']] = np.nan
+    logger.info(f"Температурна чутливість: {n_groups} періодів ({PERIODS[period]}) одним розв'язком")
+    return result.astype({'a': np.float32, 'b': np.float32, 'c': np.float32,
+                          'r2': np.float32, 'temp_mean': np.float32, 'sensitivity': np.float32})
+
+
+def fit_all_periods(df: pd.DataFrame) -> dict:
+    """Таблиці коефіцієнтів для всіх підтримуваних періодів."""
+    return {period: fit_temperature_sensitivity(df, period) for period in PERIODS}
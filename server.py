@@ -0,0 +1,303 @@
+"""
+Локальний HTTP/JSON сервіс (без Tk): генерація даних та агрегати вкладок аналізу.
+
+    python server.py --port 8765 --preload 2024-2024
+
+Ендпоінти (GET, параметри у query string):
+    /api/health
+    /api/datasets
+    /api/generate?start=2024&end=2024&seed=42     (seed=random — випадковий режим)
+    /api/day?date=2024-03-05[&dataset=...]
+    /api/monthly?year=2024[&dataset=...]
+    /api/daily?year=2024&month=3[&dataset=...]
+    /api/yearly[?dataset=...]
+Без dataset використовується останній згенерований набір.
+"""
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from urllib.parse import urlsplit, parse_qsl
+import numpy as np
+import pandas as pd
+
+import logic
+import queries
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _jsonable(value):
+    """json.dumps default: NumPy-скаляри та дати."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Непідтримуваний тип: {type(value).__name__}")
+
+
+def _records(frame: pd.DataFrame) -> list:
+    """Таблиця (з індексом як колонками) у список JSON-записів."""
+    frame = frame.reset_index() if frame.index.names[0] is not None else frame
+    # float32 -> float64 з округленням, щоб у JSON не було хвостів на кшталт 3881.60009765625
+    float32 = [c for c in frame.columns if frame[c].dtype == np.float32]
+    if float32:
+        frame = frame.astype({c: np.float64 for c in float32}).round({c: 3 for c in float32})
+    return frame.to_dict(orient='records')
+
+
+class ResponseCache:
+    """LRU-кеш готових тіл відповідей, ключ — маршрут та нормалізовані параметри."""
+
+    def __init__(self, max_items: int = 512):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        body = self._items.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body: bytes):
+        self._items[key] = body
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+class DataService:
+    """
+    Набори даних у пам'яті та запити до них. Методи *_sync виконуються в пулі потоків,
+    цикл подій лише розбирає HTTP та віддає кешовані байти.
+    """
+
+    def __init__(self, max_datasets: int = 4, workers: int = 4, cache_items: int = 512):
+        self.datasets = OrderedDict()   # id -> підготовлений DataFrame
+        self.max_datasets = max_datasets
+        self.latest = None
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+        self.cache = ResponseCache(cache_items)
+        self._pending = {}              # id -> Future генерації, що вже виконується
+        self._random_ids = itertools.count(1)
+
+    # --- обчислення (пул потоків) ---
+
+    def _generate_sync(self, start: int, end: int, seed):
+        df = logic.prepare_data(logic.generate_power_load_data(start, end, seed))
+        df.attrs.clear()  # службовий еталон аномалій генератора не потрібен сервісу
+        return df
+
+    def _query_sync(self, route: str, df: pd.DataFrame, params: dict):
+        if route == 'day':
+            day = pd.Timestamp(_param(params, 'date')).date()
+            data = df[df['date'] == day]
+            if data.empty:
+                raise ApiError(404, f"Немає даних за {day}")
+            return {'date': day, 'hours': _records(queries.day_profile(data))}
+        if route == 'monthly':
+            year = int(_param(params, 'year'))
+            data = df[df['year'] == year]
+            if data.empty:
+                raise ApiError(404, f"Немає даних за {year} рік")
+            return {'year': year, 'months': _records(queries.monthly_stats(data))}
+        if route == 'daily':
+            year, month = int(_param(params, 'year')), int(_param(params, 'month'))
+            data = df[(df['year'] == year) & (df['month'] == month)]
+            if data.empty:
+                raise ApiError(404, f"Немає даних за {month:02d}.{year}")
+            return {'year': year, 'month': month, 'days': _records(queries.daily_stats(data))}
+        if route == 'yearly':
+            return {'months': _records(queries.yearly_comparison(df))}
+        raise ApiError(404, f"Невідомий маршрут: {route}")
+
+    # --- асинхронний інтерфейс ---
+
+    async def generate(self, start: int, end: int, seed) -> str:
+        if start > end:
+            raise ApiError(400, "start має бути не більшим за end")
+        if seed is None:
+            dataset_id = f"{start}-{end}-random{next(self._random_ids)}"
+        else:
+            dataset_id = f"{start}-{end}-seed{seed}"
+            if dataset_id in self.datasets:
+                self.latest = dataset_id
+                return dataset_id
+
+        future = self._pending.get(dataset_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self._generate_sync, start, end, seed)
+            self._pending[dataset_id] = future
+        try:
+            df = await future
+        finally:
+            self._pending.pop(dataset_id, None)
+
+        self.datasets[dataset_id] = df
+        while len(self.datasets) > self.max_datasets:
+            evicted, _ = self.datasets.popitem(last=False)
+            logger.info(f"API: набір {evicted} витіснено з пам'яті")
+        self.latest = dataset_id
+        logger.info(f"API: набір {dataset_id} готовий ({len(df)} записів)")
+        return dataset_id
+
+    def resolve(self, params: dict):
+        dataset_id = params.get('dataset') or self.latest
+        if dataset_id is None:
+            raise ApiError(404, "Немає жодного набору даних: спершу викличте /api/generate")
+        if dataset_id not in self.datasets:
+            raise ApiError(404, f"Набір {dataset_id} не знайдено")
+        return dataset_id, self.datasets[dataset_id]
+
+    async def handle(self, path: str, params: dict):
+        """Повертає (статус, тіло, ознака влучання в кеш)."""
+        route = path.rstrip('/').rsplit('/', 1)[-1] if path.startswith('/api/') else ''
+
+        if route == 'health':
+            return 200, _encode({'status': 'ok', 'datasets': len(self.datasets),
+                                 'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses}), False
+        if route == 'datasets':
+            return 200, _encode({'latest': self.latest,
+                                 'datasets': {k: len(v) for k, v in self.datasets.items()}}), False
+        if route == 'generate':
+            seed = params.get('seed', '42')
+            seed = None if seed == 'random' else int(seed)
+            dataset_id = await self.generate(int(_param(params, 'start')), int(_param(params, 'end')), seed)
+            return 200, _encode({'dataset': dataset_id, 'rows': len(self.datasets[dataset_id])}), False
+
+        dataset_id, df = self.resolve(params)
+        # Набір із seed детермінований, тож ключ (маршрут, набір, параметри) однозначно визначає відповідь
+        key = (route, dataset_id, tuple(sorted((k, v) for k, v in params.items() if k != 'dataset')))
+        body = self.cache.get(key)
+        if body is not None:
+            return 200, body, True
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self._query_sync, route, df, params)
+        result['dataset'] = dataset_id
+        body = await loop.run_in_executor(self.executor, _encode, result)
+        self.cache.put(key, body)
+        return 200, body, False
+
+
+def _param(params: dict, name: str) -> str:
+    if name not in params:
+        raise ApiError(400, f"Бракує параметра '{name}'")
+    return params[name]
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=_jsonable).encode('utf-8')
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """Мінімальний розбір HTTP/1.1: (метод, ціль, заголовки) або None при закритті з'єднання."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, _ = lines[0].split(' ', 2)
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length:
+        await reader.readexactly(length)  # тіло не використовується
+    return method, target, headers
+
+
+class ApiServer:
+    def __init__(self, service: DataService):
+        self.service = service
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, body, cached = await self.respond(method, target)
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"X-Cache: {'HIT' if cached else 'MISS'}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"API: з'єднання закрито: {e}")
+        finally:
+            writer.close()
+
+    async def respond(self, method: str, target: str):
+        if method != 'GET':
+            return 405, _encode({'error': 'Підтримується лише GET'}), False
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        try:
+            return await self.service.handle(url.path, params)
+        except ApiError as e:
+            return e.status, _encode({'error': str(e)}), False
+        except ValueError as e:
+            return 400, _encode({'error': f"Некоректний параметр: {e}"}), False
+        except Exception as e:
+            logger.error(f"API: помилка обробки {target}: {e}", exc_info=True)
+            return 500, _encode({'error': str(e)}), False
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765, preload: str = None, workers: int = 4):
+    service = DataService(workers=workers)
+    if preload:
+        start, _, end = preload.partition('-')
+        await service.generate(int(start), int(end or start), 42)
+    server = await asyncio.start_server(ApiServer(service).handle_connection, host, port)
+    logger.info(f"API-сервер слухає http://{host}:{port}/api/")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Локальний HTTP/JSON сервіс Energy Monitor")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--preload', help="Згенерувати набір при старті, напр. 2020-2024 (seed 42)")
+    parser.add_argument('--workers', type=int, default=4, help="Потоки для обчислень")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout,
+                        format='%(asctime)s | %(levelname)s | %(message)s')
+    try:
+        asyncio.run(serve(args.host, args.port, args.preload, args.workers))
+    except KeyboardInterrupt:
+        logger.info("API-сервер зупинено")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import time
+import numpy as np
+import pandas as pd
+import logging
+from numpy.lib.stride_tricks import sliding_window_view
+
+from peaks import hours_per_sample
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Цикли, закладені в модель generate_power_load_data (години)
+KNOWN_CYCLES = {'Добовий': 24.0, 'Тижневий': 168.0, 'Річний': 8766.0}
+
+HOURS_PER_WEEK = 168
+# 1970-01-01 — четвер: зсув, щоб година тижня 0 припадала на понеділок 00:00
+EPOCH_HOUR_OF_WEEK = 3 * 24
+
+
+def _fast_length(n: int) -> int:
+    """Найменша довжина вигляду 2^a·3^b·5^c ≥ n (rfft для неї не деградує до Bluestein)."""
+    best = 1 << int(np.ceil(np.log2(max(n, 1))))
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            length = p35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def _centered(load: np.ndarray):
+    """Центрований ряд (NaN -> 0 після віднімання середнього) та його дисперсія."""
+    x = np.asarray(load, dtype=np.float64)
+    mean = np.nanmean(x)
+    x = np.nan_to_num(x - mean)
+    return x, float(x.var())
+
+
+def amplitude_spectrum(load: np.ndarray, step_h: float = 1.0, max_full: int = 1 << 22,
+                       segment_h: float = 8 * 8766, batch: int = 16):
+    """
+    Амплітудний спектр (МВт) ряду з вікном Ганна.
+    До max_full відліків — один rfft по всьому ряду; довші ряди — метод Велча:
+    сегменти по segment_h годин з перекриттям 50%, rfft пакетами по batch сегментів,
+    усереднення потужності (пам'ять обмежена batch × сегмент).
+    Повертає (частоти у 1/год, амплітуди, кількість сегментів).
+    """
+    x, _ = _centered(load)
+    n = len(x)
+    if n <= max_full:
+        window = np.hanning(n)
+        n_fft = _fast_length(n)
+        spectrum = np.abs(np.fft.rfft(x * window, n=n_fft)) * 2 / window.sum()
+        return np.fft.rfftfreq(n_fft, d=step_h), spectrum, 1
+
+    seg = int(segment_h / step_h)
+    window = np.hanning(seg)
+    n_fft = _fast_length(seg)
+    starts = np.arange(0, n - seg + 1, seg // 2)
+    frames = sliding_window_view(x, seg)
+    power = np.zeros(n_fft // 2 + 1)
+    for lo in range(0, len(starts), batch):
+        block = frames[starts[lo:lo + batch]]  # копія лише пакета сегментів
+        block = (block - block.mean(axis=1, keepdims=True)) * window
+        power += (np.abs(np.fft.rfft(block, n=n_fft, axis=1)) ** 2).sum(axis=0)
+    spectrum = np.sqrt(power / len(starts)) * 2 / window.sum()
+    return np.fft.rfftfreq(n_fft, d=step_h), spectrum, len(starts)
+
+
+def dominant_periods(freqs: np.ndarray, spectrum: np.ndarray, variance: float,
+                     n: int = 10, min_cycles: float = 2.0, span_h: float = None) -> pd.DataFrame:
+    """
+    Найсильніші локальні максимуми спектра (argpartition) з параболічним уточненням
+    частоти по логарифму амплітуди. Періоди, що вкладаються в ряд менше min_cycles разів, відкидаються.
+    """
+    interior = np.arange(1, len(spectrum) - 1)
+    is_peak = (spectrum[1:-1] > spectrum[:-2]) & (spectrum[1:-1] >= spectrum[2:])
+    if span_h:
+        is_peak &= freqs[1:-1] >= min_cycles / span_h
+    candidates = interior[is_peak]
+    if len(candidates) > n:
+        candidates = candidates[np.argpartition(spectrum[candidates], -n)[-n:]]
+    candidates = candidates[np.argsort(spectrum[candidates])[::-1]]
+
+    y0, y1, y2 = (np.log(np.maximum(spectrum[candidates + k], 1e-12)) for k in (-1, 0, 1))
+    denom = y0 - 2 * y1 + y2
+    shift = np.where(denom != 0, 0.5 * (y0 - y2) / np.where(denom != 0, denom, 1), 0.0)
+    df_bin = freqs[1] - freqs[0]
+    freq = freqs[candidates] + shift * df_bin
+    amplitude = np.exp(y1 - 0.25 * (y0 - y2) * shift)
+
+    period = 1 / freq
+    return pd.DataFrame({
+        'period_h': period.round(2),
+        'period': [period_label(p) for p in period],
+        'amplitude_mw': amplitude.round(1),
+        'variance_share': (amplitude ** 2 / 2 / variance * 100).round(2) if variance else 0.0,
+    })
+
+
+def cycle_amplitudes(ts_hours: np.ndarray, load: np.ndarray, variance: float) -> pd.DataFrame:
+    """
+    Амплітуди відомих циклів прямою проєкцією на cos/sin заданого періоду (O(n) на цикл,
+    без розмиття між бінами спектра).
+    """
+    x, _ = _centered(load)
+    t = (ts_hours - ts_hours[0]).astype(np.float64)
+    rows = []
+    for name, period in KNOWN_CYCLES.items():
+        if t[-1] < 2 * period:
+            continue
+        phase = 2 * np.pi * t / period
+        amplitude = 2 * np.hypot(x @ np.cos(phase), x @ np.sin(phase)) / len(x)
+        rows.append((name, period, period_label(period), round(float(amplitude), 1),
+                     round(float(amplitude ** 2 / 2 / variance * 100), 2) if variance else 0.0))
+    return pd.DataFrame(rows, columns=['cycle', 'period_h', 'period', 'amplitude_mw', 'variance_share'])
+
+
+def period_label(hours: float) -> str:
+    if hours < 48:
+        return f"{hours:.1f} год"
+    if hours < 24 * 120:
+        return f"{hours / 24:.1f} дн"
+    return f"{hours / 8766:.2f} р"
+
+
+def decompose(ts_hours: np.ndarray, load: np.ndarray, step_h: float = 1.0) -> dict:
+    """
+    Швидка декомпозиція тренд + сезонність + залишок (O(n)):
+    тренд — центроване тижневе ковзне середнє (cumsum), сезонність — середні
+    по годині тижня від детрендованого ряду (bincount), залишок — решта.
+    """
+    x = np.asarray(load, dtype=np.float64)
+    valid = ~np.isnan(x)
+    n = len(x)
+    window = max(int(round(HOURS_PER_WEEK / step_h)), 1)
+    half = window // 2
+
+    csum = np.concatenate([[0.0], np.cumsum(np.where(valid, x, 0.0))])
+    ccount = np.concatenate([[0], np.cumsum(valid)])
+    idx = np.arange(n)
+    lo = np.maximum(idx - half, 0)
+    hi = np.minimum(idx - half + window, n)
+    trend = (csum[hi] - csum[lo]) / np.maximum(ccount[hi] - ccount[lo], 1)
+
+    how = (ts_hours + EPOCH_HOUR_OF_WEEK) % HOURS_PER_WEEK
+    detrended = np.where(valid, x - trend, 0.0)
+    counts = np.bincount(how[valid], minlength=HOURS_PER_WEEK)
+    profile = np.bincount(how, weights=detrended, minlength=HOURS_PER_WEEK) / np.maximum(counts, 1)
+    profile -= profile.mean()
+    seasonal = profile[how]
+    resid = x - trend - seasonal
+
+    def strength(component):
+        # Частка варіації, яку пояснює компонента (0..1)
+        total = np.nanvar(component + resid)
+        return float(max(0.0, 1 - np.nanvar(resid) / total)) if total else 0.0
+
+    return {
+        'trend': trend.astype(np.float32),
+        'seasonal': seasonal.astype(np.float32),
+        'resid': resid.astype(np.float32),
+        'profile': profile,
+        'seasonal_strength': strength(seasonal),
+        'trend_strength': strength(trend),
+    }
+
+
+def compute_spectral_analytics(df: pd.DataFrame, n_peaks: int = 15) -> dict:
+    """Спектр, домінантні періоди, відомі цикли та декомпозиція для вкладки "Спектр"."""
+    started = time.perf_counter()
+    step_h = hours_per_sample(df)
+    ts_hours = df['timestamp'].to_numpy(dtype='datetime64[h]').astype(np.int64)
+    load = df['load_mw'].to_numpy()
+    _, variance = _centered(load)
+
+    freqs, spectrum, segments = amplitude_spectrum(load, step_h)
+    span_h = len(load) * step_h if segments == 1 else (len(spectrum) - 1) * 2 * step_h
+    peaks_table = dominant_periods(freqs, spectrum, variance, n_peaks, span_h=span_h)
+    cycles = cycle_amplitudes(ts_hours, load, variance)
+    parts = decompose(ts_hours, load, step_h)
+
+    # Тренд для графіка — добові середні (тисячі точок замість сотень тисяч)
+    trend_daily = pd.Series(parts['trend'], index=df['timestamp']).resample('D').mean()
+
+    logger.info(f"Спектр: {len(load)} відліків, сегментів {segments}, "
+                f"сезонність {parts['seasonal_strength']:.2f}, тренд {parts['trend_strength']:.2f}, "
+                f"{(time.perf_counter() - started) * 1000:.0f} мс")
+    return {
+        'freqs': freqs,
+        'amplitude': spectrum,
+        'segments': segments,
+        'peaks': peaks_table,
+        'cycles': cycles,
+        'profile': parts['profile'],
+        'trend_daily': trend_daily,
+        'seasonal_strength': parts['seasonal_strength'],
+        'trend_strength': parts['trend_strength'],
+    }
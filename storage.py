@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+DB_FILENAME = "energy.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    name        TEXT NOT NULL,
+    created     TEXT NOT NULL,
+    mode        TEXT,
+    start_year  INTEGER,
+    end_year    INTEGER,
+    rows        INTEGER
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id        INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    ts            INTEGER NOT NULL,  -- секунди від епохи (локальний час без поясу)
+    year          INTEGER NOT NULL,
+    month         INTEGER NOT NULL,
+    load_mw       REAL,
+    temperature_c REAL,
+    wind_mps      REAL,
+    is_holiday    INTEGER,
+    capacity_mw   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_meas_run_ts ON measurements(run_id, ts);
+CREATE INDEX IF NOT EXISTS idx_meas_run_ym ON measurements(run_id, year, month);
+CREATE INDEX IF NOT EXISTS idx_meas_ts ON measurements(ts);
+
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    run_id     INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    day        TEXT NOT NULL,
+    year       INTEGER NOT NULL,
+    month      INTEGER NOT NULL,
+    total_mwh  REAL, avg_load REAL, max_load REAL, min_load REAL,
+    PRIMARY KEY (run_id, day)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_run_ym ON daily_rollup(run_id, year, month);
+
+CREATE TABLE IF NOT EXISTS monthly_rollup (
+    run_id     INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    year       INTEGER NOT NULL,
+    month      INTEGER NOT NULL,
+    total_mwh  REAL, avg_load REAL, max_load REAL, min_load REAL, days_count INTEGER,
+    PRIMARY KEY (run_id, year, month)
+);
+"""
+
+MEASUREMENT_COLUMNS = ['load_mw', 'temperature_c', 'wind_mps', 'is_holiday', 'capacity_mw']
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """З'єднання у режимі WAL (читання не блокуються записом) зі створеною схемою."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _rows(df: pd.DataFrame, run_id: int):
+    """Кортежі для executemany з NumPy-колонок (без iterrows)."""
+    ts = df['timestamp'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    cols = [np.full(len(df), run_id), ts, df['year'].to_numpy(), df['timestamp'].dt.month.to_numpy()]
+    cols += [df[c].to_numpy() for c in MEASUREMENT_COLUMNS]
+    # tolist() перетворює NumPy-скаляри на типи Python, які розуміє sqlite3
+    return zip(*(c.tolist() for c in cols))
+
+
+def save_run(db_path: str, df: pd.DataFrame, name: str, mode: str = None, chunk: int = 200_000) -> int:
+    """
+    Зберігає прогін: виміри (пакетами executemany в одній транзакції) та зведення.
+    Повертає run_id.
+    """
+    conn = connect(db_path)
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO runs (name, created, mode, start_year, end_year, rows) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), mode,
+                 int(df['year'].min()), int(df['year'].max()), len(df))
+            )
+            run_id = cur.lastrowid
+
+            insert = f"INSERT INTO measurements VALUES ({', '.join('?' * (4 + len(MEASUREMENT_COLUMNS)))})"
+            for lo in range(0, len(df), chunk):
+                conn.executemany(insert, _rows(df.iloc[lo:lo + chunk], run_id))
+
+            daily, monthly = rollups(df)
+            for table, frame in (('daily_rollup', daily), ('monthly_rollup', monthly)):
+                columns = ', '.join(['run_id', *frame.columns])
+                placeholders = ', '.join('?' * (len(frame.columns) + 1))
+                conn.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                                 ((run_id, *r) for r in frame.itertuples(index=False, name=None)))
+        logger.info(f"SQLite: прогін #{run_id} '{name}' збережено ({len(df)} записів) у {db_path}")
+        return run_id
+    finally:
+        conn.close()
+
+
+def rollups(df: pd.DataFrame):
+    """
+    Добові та місячні зведення у форматі таблиць daily_rollup / monthly_rollup
+    (ті самі агрегати, що рахують вкладки "Добове споживання" та "Річна статистика").
+    """
+    load = df['load_mw'].astype(np.float64)
+    day = df['timestamp'].dt.floor('D')
+    daily = load.groupby(day).agg(['sum', 'mean', 'max', 'min'])
+    daily = pd.DataFrame({
+        'day': daily.index.strftime('%Y-%m-%d'),
+        'year': daily.index.year.astype(int), 'month': daily.index.month.astype(int),
+        'total_mwh': daily['sum'].round(1).to_numpy(), 'avg_load': daily['mean'].round(1).to_numpy(),
+        'max_load': daily['max'].to_numpy(), 'min_load': daily['min'].to_numpy(),
+    })
+
+    month = df['timestamp'].dt.month
+    monthly = load.groupby([df['year'].astype(int), month]).agg(['sum', 'mean', 'max', 'min']).round(1)
+    monthly['days_count'] = daily.groupby(['year', 'month']).size()
+    monthly.index.names = ['year', 'month']
+    monthly = monthly.reset_index().rename(columns={
+        'sum': 'total_mwh', 'mean': 'avg_load', 'max': 'max_load', 'min': 'min_load'})
+    return daily, monthly.astype({'year': int, 'month': int, 'days_count': int})
+
+
+class StoredRun:
+    """
+    Доступ до одного збереженого прогону індексованими запитами:
+    вкладки отримують лише потрібний зріз, не завантажуючи всю історію.
+    """
+
+    def __init__(self, db_path: str, run_id: int):
+        self.db_path = db_path
+        self.run_id = run_id
+        self.conn = connect(db_path)
+        row = self.conn.execute("SELECT name, start_year, end_year FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Прогін #{run_id} не знайдено")
+        self.name, self.start_year, self.end_year = row
+
+    def close(self):
+        self.conn.close()
+
+    def _frame(self, where: str, params) -> pd.DataFrame:
+        sql = (f"SELECT ts, year, {', '.join(MEASUREMENT_COLUMNS)} FROM measurements "
+               f"WHERE run_id = ? AND {where} ORDER BY ts")
+        df = pd.read_sql_query(sql, self.conn, params=(self.run_id, *params))
+        df.insert(0, 'timestamp', pd.to_datetime(df.pop('ts'), unit='s'))
+        return df.astype({'load_mw': np.float32, 'temperature_c': np.float32, 'wind_mps': np.float32,
+                          'capacity_mw': np.float32, 'is_holiday': np.int8, 'year': np.int16})
+
+    def years(self):
+        return [r[0] for r in self.conn.execute(
+            "SELECT DISTINCT year FROM monthly_rollup WHERE run_id = ? ORDER BY year", (self.run_id,))]
+
+    def dates(self):
+        return [r[0] for r in self.conn.execute(
+            "SELECT day FROM daily_rollup WHERE run_id = ? ORDER BY day", (self.run_id,))]
+
+    def day(self, date) -> pd.DataFrame:
+        start = int(pd.Timestamp(date).timestamp())
+        return self._frame("ts >= ? AND ts < ?", (start, start + 86400))
+
+    def month(self, year: int, month: int) -> pd.DataFrame:
+        return self._frame("year = ? AND month = ?", (year, month))
+
+    def year(self, year: int) -> pd.DataFrame:
+        return self._frame("year = ?", (year,))
+
+    def monthly_rollup(self) -> pd.DataFrame:
+        return pd.read_sql_query("SELECT * FROM monthly_rollup WHERE run_id = ? ORDER BY year, month",
+                                 self.conn, params=(self.run_id,))
+
+
+def list_runs(db_path: str) -> pd.DataFrame:
+    if not os.path.exists(db_path):
+        return pd.DataFrame(columns=['run_id', 'name', 'created', 'mode', 'start_year', 'end_year', 'rows'])
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query("SELECT * FROM runs ORDER BY run_id", conn)
+    finally:
+        conn.close()
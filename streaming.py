@@ -0,0 +1,238 @@
+import time
+import logging
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+
+import logic
+from peaks import hours_per_sample
+
+# Отримуємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+NS_PER_DAY = 86_400_000_000_000
+
+
+class RingBuffer:
+    """Кільцевий буфер фіксованого розміру для живого ряду (час у ns + навантаження)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.load = np.zeros(capacity, dtype=np.float32)
+        self.head = 0   # позиція наступного запису
+        self.size = 0
+
+    def extend(self, ts: np.ndarray, load: np.ndarray):
+        """Векторний запис пакета; старі значення перезаписуються."""
+        n = len(ts)
+        if n >= self.capacity:
+            ts, load, n = ts[-self.capacity:], load[-self.capacity:], self.capacity
+        first = min(n, self.capacity - self.head)
+        self.ts[self.head:self.head + first] = ts[:first]
+        self.load[self.head:self.head + first] = load[:first]
+        if n > first:
+            self.ts[:n - first] = ts[first:]
+            self.load[:n - first] = load[first:]
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def latest(self, n: int = None):
+        """Останні n значень у хронологічному порядку (копія лише для відмальовки)."""
+        n = self.size if n is None else min(n, self.size)
+        idx = (self.head - n + np.arange(n)) % self.capacity
+        return self.ts[idx], self.load[idx]
+
+
+class IncrementalAggregates:
+    """
+    Добові, місячні та пікові агрегати, що оновлюються інкрементально.
+    Пакет розбивається на відрізки однієї доби (reduceat), тож вартість — O(1) на відлік;
+    groupby по всій історії ніколи не перераховується.
+    """
+
+    def __init__(self, keep_days: int = 62, keep_months: int = 120, hours_per_sample: float = 1.0):
+        self.hours_per_sample = hours_per_sample
+        self.keep_months = keep_months
+        self.days = deque(maxlen=keep_days)  # завершені доби: (дата, енергія, сер., макс.)
+        self.months = {}                     # (рік, місяць) -> [енергія, к-сть, макс.]
+        self.peak = (None, -np.inf)          # (час, МВт) за весь час
+        self.count = 0
+        self._day = None
+        self._day_acc = [0.0, 0, -np.inf]    # сума, к-сть, макс. поточної доби
+
+    def update(self, ts: np.ndarray, load: np.ndarray):
+        if len(ts) == 0:
+            return
+        day_keys = ts // NS_PER_DAY
+        starts = np.flatnonzero(np.concatenate([[True], day_keys[1:] != day_keys[:-1]]))
+        sums = np.add.reduceat(load, starts, dtype=np.float64)
+        maxes = np.maximum.reduceat(load, starts)
+        counts = np.diff(np.append(starts, len(ts)))
+
+        for key, seg_sum, seg_max, seg_count in zip(day_keys[starts], sums, maxes, counts):
+            if key != self._day:
+                self._close_day()
+                self._day = key
+            acc = self._day_acc
+            acc[0] += seg_sum
+            acc[1] += seg_count
+            acc[2] = max(acc[2], seg_max)
+
+        i = int(np.argmax(load))
+        if load[i] > self.peak[1]:
+            self.peak = (pd.Timestamp(int(ts[i])), float(load[i]))
+        self.count += len(ts)
+
+    def _close_day(self):
+        if self._day is None or self._day_acc[1] == 0:
+            return
+        total, n, peak = self._day_acc
+        date = pd.Timestamp(int(self._day) * NS_PER_DAY)
+        self.days.append((date.date(), total * self.hours_per_sample, total / n, peak))
+        key = (date.year, date.month)
+        if key not in self.months and len(self.months) >= self.keep_months:
+            # Найстаріший місяць (dict зберігає порядок вставки)
+            self.months.pop(next(iter(self.months)))
+        month = self.months.setdefault(key, [0.0, 0, -np.inf])
+        month[0] += total * self.hours_per_sample
+        month[1] += n
+        month[2] = max(month[2], peak)
+        self._day_acc = [0.0, 0, -np.inf]
+
+    def current_day(self):
+        """Незавершена поточна доба: (дата, енергія, сер., макс.) або None."""
+        total, n, peak = self._day_acc
+        if self._day is None or n == 0:
+            return None
+        date = pd.Timestamp(int(self._day) * NS_PER_DAY).date()
+        return date, total * self.hours_per_sample, total / n, peak
+
+    def month_rows(self, n: int = 12):
+        """
+        Останні n місяців: (рік, місяць, енергія, сер., макс.), поточний місяць —
+        разом із незавершеною добою.
+        """
+        months = {key: list(acc) for key, acc in list(self.months.items())[-n:]}
+        total, count, peak = self._day_acc
+        if self._day is not None and count:
+            date = pd.Timestamp(int(self._day) * NS_PER_DAY)
+            month = months.setdefault((date.year, date.month), [0.0, 0, -np.inf])
+            month[0] += total * self.hours_per_sample
+            month[1] += count
+            month[2] = max(month[2], peak)
+        return [(y, m, energy, energy / self.hours_per_sample / samples, mx)
+                for (y, m), (energy, samples, mx) in list(months.items())[-n:]]
+
+
+def model_source(start_year: int, seed: int = None, step_minutes: int = 60):
+    """
+    Нескінченне джерело за моделлю generate_power_load_data: рік за роком, пакетами.
+    step_minutes < 60 — пришвидшений субгодинний режим (лінійна інтерполяція годинних значень).
+    """
+    year = start_year
+    while True:
+        df = logic.generate_power_load_data(year, year, seed)
+        ts = df['timestamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        load = df['load_mw'].to_numpy()
+        if step_minutes < 60:
+            fine = np.arange(ts[0], ts[-1] + 1, step_minutes * 60 * 10 ** 9, dtype=np.int64)
+            load = np.interp(fine, ts, load).astype(np.float32)
+            ts = fine
+        yield ts, load
+        year += 1
+        seed = None if seed is None else seed + 1
+
+
+def csv_hours_per_sample(path: str, rows: int = 1000) -> float:
+    """Крок ряду CSV у годинах за першими rows мітками часу (0.25 для 15-хвилинних даних)."""
+    head = pd.read_csv(path, usecols=['timestamp'], nrows=rows)
+    head['timestamp'] = pd.to_datetime(head['timestamp'], format='ISO8601')
+    return hours_per_sample(head)
+
+
+def csv_source(path: str, chunksize: int = 100_000):
+    """Відтворення експортованого CSV (raw_data.csv / power_load_data.csv) пакетами."""
+    for chunk in pd.read_csv(path, usecols=['timestamp', 'load_mw'], chunksize=chunksize,
+                             dtype={'load_mw': np.float32}):
+        ts = pd.to_datetime(chunk['timestamp'], format='ISO8601')
+        yield ts.to_numpy(dtype='datetime64[ns]').astype(np.int64), chunk['load_mw'].to_numpy()
+
+
+class LiveSimulator:
+    """
+    Фоновий потік, що подає відліки з джерела у RingBuffer та агрегати зі швидкістю
+    samples_per_sec. Пам'ять обмежена розміром буфера та кількістю збережених діб.
+    """
+
+    def __init__(self, source, samples_per_sec: float = 1000, capacity: int = 24 * 7 * 4,
+                 hours_per_sample: float = 1.0, tick: float = 0.05):
+        self.source = source
+        self.samples_per_sec = samples_per_sec
+        self.tick = tick
+        self.buffer = RingBuffer(capacity)
+        self.aggregates = IncrementalAggregates(hours_per_sample=hours_per_sample)
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Live-режим запущено: {self.samples_per_sec:g} відліків/с")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        logger.info(f"Live-режим зупинено: оброблено {self.aggregates.count} відліків")
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        pending_ts = np.empty(0, dtype=np.int64)
+        pending_load = np.empty(0, dtype=np.float32)
+        budget = 0.0
+        exhausted = False
+        last = time.perf_counter()
+        try:
+            while not self._stop.is_set() and not exhausted:
+                now = time.perf_counter()
+                budget += (now - last) * self.samples_per_sec
+                last = now
+                n = int(budget)
+                while len(pending_ts) < n:
+                    try:
+                        ts, load = next(self.source)
+                    except StopIteration:
+                        exhausted, n = True, len(pending_ts)
+                        logger.info("Live-режим: джерело вичерпано.")
+                        break
+                    pending_ts = np.concatenate([pending_ts, ts])
+                    pending_load = np.concatenate([pending_load, load])
+                if n:
+                    batch_ts, batch_load = pending_ts[:n], pending_load[:n]
+                    pending_ts, pending_load = pending_ts[n:], pending_load[n:]
+                    budget -= n
+                    with self.lock:
+                        self.buffer.extend(batch_ts, batch_load)
+                        self.aggregates.update(batch_ts, batch_load)
+                self._stop.wait(self.tick)
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Live-режим: помилка джерела: {e}")
+
+    def snapshot(self, window: int):
+        """Останні window відліків та копія агрегатів для UI (під блокуванням)."""
+        with self.lock:
+            ts, load = self.buffer.latest(window)
+            agg = self.aggregates
+            days = list(agg.days)[-31:]
+            current = agg.current_day()
+            months = agg.month_rows()
+            return ts, load, days, current, months, agg.peak, agg.count
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import anomalies
+import logic
+
+
+@pytest.fixture(scope='module')
+def load():
+    return logic.generate_power_load_data(2020, 2023, 42)['load_mw'].to_numpy()
+
+
+def _run(load, chunk_hours):
+    detector = anomalies.StreamingAnomalyDetector()
+    first = max(chunk_hours, 2 * detector.weeks * anomalies.HOURS_PER_WEEK)
+    bounds = [0] + list(range(first, len(load), chunk_hours)) + [len(load)]
+    parts = [detector.update(load[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+@pytest.mark.parametrize('chunk_hours', [5000, 337])
+def test_chunked_run_equals_single_pass(load, chunk_hours):
+    baseline, z = _run(load, len(load))
+    chunked_baseline, chunked_z = _run(load, chunk_hours)
+    np.testing.assert_allclose(chunked_baseline, baseline, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(chunked_z, z, rtol=0, atol=1e-9)
+
+
+def test_scale_ignores_isolated_spikes():
+    rng = np.random.default_rng(0)
+    resid = np.abs(rng.normal(0, 50, 24 * 60))
+    spiked = resid.copy()
+    spiked[24 * 40:24 * 45:10] = 5000  # 12 викидів у межах одного вікна масштабу
+    scale = anomalies.StreamingAnomalyDetector()._robust_scale(resid)
+    scale_spiked = anomalies.StreamingAnomalyDetector()._robust_scale(spiked)
+    np.testing.assert_allclose(scale[24 * 40:], scale_spiked[24 * 40:], rtol=0.05)
+    assert abs(np.median(scale[24 * 31:]) - 50) < 5
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingest
+
+
+@pytest.fixture
+def quarter_hour_csv(tmp_path):
+    """Два дні 15-хвилинних вимірів з наївним локальним часом без секунд."""
+    ts = pd.date_range('2024-01-01 00:00', periods=2 * 96, freq='15min')
+    load = 3000 + 500 * np.sin(np.arange(len(ts)) / 96 * 2 * np.pi)
+    path = tmp_path / 'power_load_data.csv'
+    pd.DataFrame({
+        'timestamp': ts.strftime('%Y-%m-%d %H:%M'),
+        'load_mw': load.round(1),
+        'temperature_c': 5.0,
+    }).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def mixed_separator_csv(tmp_path):
+    """Погодинні виміри, де кожен десятий час записано з роздільником 'T' (ISO8601)."""
+    ts = pd.date_range('2024-01-01 00:00', periods=240, freq='h')
+    text = pd.Series(ts.strftime('%Y-%m-%d %H:%M:%S'))
+    text[::10] = ts[::10].strftime('%Y-%m-%dT%H:%M:%S')
+    path = tmp_path / 'mixed.csv'
+    pd.DataFrame({'timestamp': text, 'load_mw': 3000.0}).to_csv(path, index=False)
+    return path
+
+
+def _read_with_pandas(path, monkeypatch):
+    monkeypatch.setattr(ingest, '_iter_chunks',
+                        lambda p, cols, chunksize, tz: ingest._iter_chunks_pandas(p, cols, chunksize, tz))
+    return ingest.read_load_csv(str(path))
+
+
+def test_naive_timestamps_stay_local(quarter_hour_csv, monkeypatch):
+    df, report = _read_with_pandas(quarter_hour_csv, monkeypatch)
+    assert df['timestamp'].iloc[0] == pd.Timestamp('2024-01-01 00:00')
+    assert report['samples_per_hour'] == 4
+    assert report['hours'] == 48
+
+
+@pytest.mark.parametrize('csv_fixture, hours', [('quarter_hour_csv', 48), ('mixed_separator_csv', 240)])
+def test_pandas_and_arrow_paths_agree(csv_fixture, hours, request, monkeypatch):
+    pytest.importorskip('pyarrow')
+    path = request.getfixturevalue(csv_fixture)
+    arrow_df, arrow_report = ingest.read_load_csv(str(path))
+    pandas_df, pandas_report = _read_with_pandas(path, monkeypatch)
+    pd.testing.assert_frame_equal(arrow_df, pandas_df)
+    assert arrow_report == pandas_report
+    assert pandas_report['hours'] == hours
+    assert pandas_report['unparsed_rows'] == 0
+    assert pandas_report['gap_hours_filled'] == 0
+
+
+def test_offsets_are_converted_to_local_time():
+    values = pd.Series(['2024-03-31 00:00:00+00:00', '2024-03-31 00:00+00:00', '2024-03-31 05:00'])
+    hours = ingest._parse_timestamps(values, 'Europe/Kyiv')
+    expected = pd.to_datetime(['2024-03-31 02:00', '2024-03-31 02:00', '2024-03-31 05:00'])
+    np.testing.assert_array_equal(hours, expected.to_numpy(dtype='datetime64[h]').astype(np.int64))
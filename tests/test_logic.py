@@ -0,0 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import logic
+
+
+def test_seeded_generation_is_independent_of_concurrent_calls():
+    expected = logic.generate_power_load_data(2023, 2024, 42)
+    # Як у пулі HTTP-сервісу: інші seed генеруються одночасно
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(logic.generate_power_load_data, 2023, 2024, seed) for seed in (42, 7, 8, 9)]
+        result = futures[0].result()
+    pd.testing.assert_frame_equal(result, expected)
+    assert (result.attrs['anomaly_indices'] == expected.attrs['anomaly_indices']).all()
@@ -0,0 +1,19 @@
+import numpy as np
+
+import logic
+import peaks
+
+
+def test_monthly_duration_curves():
+    df = logic.prepare_data(logic.generate_power_load_data(2024, 2024, 42))
+    levels, curves = peaks.duration_curves(df, monthly=True)
+    assert curves.index.names == ['year', 'month']
+    # Найнижчий рівень перевищується всі години місяця
+    assert (curves.iloc[:, 0] == df.groupby(['year', 'month']).size()).all()
+
+    table = peaks.duration_curve_table(curves, peaks.MONTHLY_DURATION_POINTS)
+    load = df.loc[df['month'] == 7, 'load_mw'].to_numpy()
+    for hours, level in zip(peaks.MONTHLY_DURATION_POINTS, table.loc[(2024, 7)]):
+        # Найвищий рівень сітки, що перевищується не менше заданої кількості годин
+        assert (load >= level).sum() >= hours > (load >= level + 10).sum()
+    assert np.isnan(table.loc[(2024, 2), '720 год']) == (len(df[df['month'] == 2]) < 720)
@@ -0,0 +1,39 @@
+import pandas as pd
+
+import pipeline
+import scenarios
+from ui_generation import files_missing
+
+
+def _report_pipeline(results, calls):
+    def report(output_dir):
+        calls.append(output_dir)
+        return results.pop(0)
+    return pipeline.Pipeline().add('excel', report, params=('output_dir',), check=files_missing)
+
+
+def test_failed_report_stage_is_retried(tmp_path):
+    path = tmp_path / "report.xlsx"
+    path.write_bytes(b"")
+    calls = []
+    pipe = _report_pipeline([None, str(path)], calls)
+    context = {'output_dir': str(tmp_path)}
+
+    assert pipe.run(context)['excel'] is None
+    # Звіт не створено — та сама конфігурація має запустити етап повторно
+    assert pipe.run(context)['excel'] == str(path)
+    assert pipe.last_run['executed'] == ['excel']
+    pipe.run(context)
+    assert pipe.last_run['skipped'] == ['excel']
+    assert len(calls) == 2
+
+
+def test_scenarios_are_found_by_fingerprint():
+    store = scenarios.ScenarioStore()
+    df = pd.DataFrame({'load_mw': [1.0]})
+    name = store.add("A", df, {}, "fp1")
+    assert store.find("fp1") == name
+    assert store.find("fp2") is None
+    # Без відбитка кожен сценарій отримує власний, не повторюваний
+    other = store.add("B", df.copy(), {})
+    assert store.get_fingerprint(other) not in (None, "fp1")
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import streaming
+
+
+def _write_csv(path, freq, days=40):
+    ts = pd.date_range('2024-01-01', periods=int(days * pd.Timedelta('1D') / pd.Timedelta(freq)), freq=freq)
+    pd.DataFrame({'timestamp': ts, 'load_mw': 1000.0}).to_csv(path, index=False)
+    return str(path)
+
+
+def _aggregate(path):
+    step = streaming.csv_hours_per_sample(path)
+    agg = streaming.IncrementalAggregates(hours_per_sample=step)
+    for ts, load in streaming.csv_source(path, chunksize=500):
+        agg.update(ts, load)
+    return step, agg
+
+
+@pytest.mark.parametrize('freq, step', [('60min', 1.0), ('15min', 0.25)])
+def test_csv_energy_does_not_depend_on_step(tmp_path, freq, step):
+    found, agg = _aggregate(_write_csv(tmp_path / 'load.csv', freq))
+    assert found == step
+    # 1000 МВт протягом доби — 24 000 МВт·год незалежно від кроку
+    assert all(energy == pytest.approx(24_000) for _, energy, _, _ in agg.days)
+    months = agg.month_rows()
+    assert [(y, m) for y, m, *_ in months] == [(2024, 1), (2024, 2)]
+    assert months[0][2] == pytest.approx(31 * 24_000)
+    # Поточний місяць включає незавершену добу
+    assert months[1][2] == pytest.approx(9 * 24_000)
+    assert months[1][3] == pytest.approx(1000)
+
+
+def test_source_error_is_recorded():
+    def broken():
+        yield np.array([0], dtype=np.int64), np.array([1.0], dtype=np.float32)
+        raise ValueError("зіпсований рядок")
+
+    sim = streaming.LiveSimulator(broken(), samples_per_sec=1000, tick=0.001)
+    sim.start()
+    sim._thread.join(timeout=5)
+    assert not sim.running
+    assert "зіпсований рядок" in sim.error
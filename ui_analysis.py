@@ -1,15 +1,22 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog, messagebox
 import pandas as pd
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
+import logic
 import plotting
+import queries
+import sensitivity
+import reserve
+import streaming
 
 class BaseAnalysisTab(ttk.Frame):
     """
     Базовий клас для вкладок аналізу.
     Включає: Верхній тулбар, Графік з навігацією (Zoom), Таблицю даних.
     """
+    uses_comparison = False  # вкладка показує дельту з порівнюваним сценарієм
+    
     def __init__(self, parent, app_context):
         super().__init__(parent)
         self.app = app_context
@@ -81,13 +88,64 @@ class BaseAnalysisTab(ttk.Frame):
 
     def add_controls(self): pass
     def get_columns(self): return []
+    def get_analytics(self, key):
+        """Результати аналітичних модулів, пораховані у фоновому потоці"""
+        return self.app.analytics.get(key)
+    def shutdown(self): pass
+    def get_comparison(self):
+        """Активне порівняння сценаріїв (scenarios.Comparison) або None"""
+        return self.app.comparison
+    def view_inputs(self):
+        """Входи вкладки: refresh_all_tabs перемальовує її лише тоді, коли вони змінились"""
+        return (self.app.data_fingerprint,
+                self.app.comparison_fingerprint if self.uses_comparison else None)
+    def has_data(self):
+        return self.app.df is not None or self.app.stored_run is not None
+    def get_years(self):
+        if self.app.df is not None:
+            return sorted(self.app.df['year'].unique().astype(str))
+        if self.app.stored_run is not None:
+            return [str(y) for y in self.app.stored_run.years()]
+        return []
+    def get_slice(self, year=None, month=None, date=None):
+        """
+        Зріз активних даних: з пам'яті, або індексованим запитом до відкритого
+        прогону SQLite (завантажується лише потрібний день/місяць/рік).
+        """
+        run = self.app.stored_run
+        if self.app.df is None and run is not None:
+            if date is not None: data = run.day(date)
+            elif month is not None: data = run.month(year, month)
+            else: data = run.year(year)
+            return logic.prepare_data(data)
+        df = self.app.df
+        if date is not None: return df[df['date'] == date]
+        if month is not None: return df[(df['year'] == year) & (df['month'] == month)]
+        return df[df['year'] == year]
     def update_data(self): pass
     def clear_tree(self):
         for item in self.tree.get_children(): self.tree.delete(item)
+    def show_needs_dataset(self):
+        """
+        Аналітика рахується лише для датасету в пам'яті: для прогону з SQLite (або без даних)
+        прибираємо таблицю, графік та роки попереднього сценарію.
+        """
+        self.clear_tree()
+        if hasattr(self, 'year_combo'):
+            self.year_combo['values'] = []
+            self.year_combo.set('')
+        self.fig.clear()
+        if self.app.stored_run is not None:
+            self.fig.text(0.5, 0.5, "Ця аналітика потребує датасету в пам'яті:\n"
+                          "згенеруйте або імпортуйте дані", ha='center', va='center',
+                          color=plotting.THEME['fg'], fontsize=11)
+        self.canvas.draw()
 
 # --- РЕАЛІЗАЦІЯ ВКЛАДОК ---
 
 class HourlyTab(BaseAnalysisTab):
+    uses_comparison = True
+    
     def get_columns(self): return ("Година", "МВт", "Temp", "Cap")
     
     def add_controls(self):
@@ -98,14 +156,18 @@ class HourlyTab(BaseAnalysisTab):
     def update_controls_state(self):
         if self.app.df is not None:
             dates = sorted(self.app.df['date'].unique().astype(str))
-            self.date_combo['values'] = dates
-            if dates: self.date_combo.set(dates[0])
+        elif self.app.stored_run is not None:
+            dates = self.app.stored_run.dates()
+        else:
+            return
+        self.date_combo['values'] = dates
+        if dates: self.date_combo.set(dates[0])
             
     def update_data(self):
-        if self.app.df is None: return
+        if not self.has_data(): return
         try:
             sel_date = pd.to_datetime(self.date_combo.get()).date()
-            data = self.app.df[self.app.df['date'] == sel_date]
+            data = self.get_slice(date=sel_date)
             
             self.clear_tree()
             for _, r in data.iterrows():
@@ -116,12 +178,28 @@ class HourlyTab(BaseAnalysisTab):
                     f"{r['capacity_mw']:.0f}"
                 ))
             
+            events = self.get_analytics('anomalies')
+            if events is not None:
+                events = events[events['timestamp'].dt.date == sel_date]
+            
+            coeffs = None
+            fits = self.get_analytics('sensitivity')
+            if fits is not None and pd.Timestamp(sel_date) in fits['D'].index:
+                coeffs = fits['D'].loc[pd.Timestamp(sel_date), ['a', 'b', 'c']].to_numpy()
+            
+            compare = None
+            comparison = self.get_comparison()
+            if comparison is not None:
+                compare = (comparison.name, comparison.other_rows(data.index.to_numpy()))
+            
             self.fig.clear()
-            plotting.plot_hourly_dashboard(self.fig, data, sel_date)
+            plotting.plot_hourly_dashboard(self.fig, data, sel_date, events, coeffs, compare)
             self.canvas.draw()
         except Exception: pass
 
 class MonthlyMonitorTab(BaseAnalysisTab):
+    uses_comparison = True
+    
     def get_columns(self): return ("Міс", "Макс", "Мін", "Сер")
     
     def add_controls(self):
@@ -130,21 +208,16 @@ class MonthlyMonitorTab(BaseAnalysisTab):
         self.year_combo.pack(side=tk.LEFT, padx=5)
         
     def update_controls_state(self):
-        if self.app.df is not None:
-            years = sorted(self.app.df['year'].unique().astype(str))
-            self.year_combo['values'] = years
-            if years: self.year_combo.set(years[0])
+        years = self.get_years()
+        self.year_combo['values'] = years
+        if years: self.year_combo.set(years[0])
             
     def update_data(self):
-        if self.app.df is None: return
+        if not self.has_data(): return
         try:
             year = int(self.year_combo.get())
-            data = self.app.df[self.app.df['year'] == year]
-            stats = data.groupby(['month', 'month_name']).agg({
-                'load_mw': ['max', 'min', 'mean', 'sum']
-            }).round(1)
-            stats.columns = ['max_load', 'min_load', 'avg_load', 'total_consumption']
-            stats = stats.sort_index(level='month')
+            data = self.get_slice(year=year)
+            stats = queries.monthly_stats(data)
             
             self.clear_tree()
             for (idx, name), r in stats.iterrows():
@@ -155,12 +228,25 @@ class MonthlyMonitorTab(BaseAnalysisTab):
                     f"{r['avg_load']:.1f}"
                 ))
             
+            events = self.get_analytics('anomalies')
+            if events is not None:
+                events = events[events['timestamp'].dt.year == year]
+            
+            compare = None
+            comparison = self.get_comparison()
+            if comparison is not None:
+                other = comparison.monthly[comparison.monthly.index.year == year]
+                other = other.set_index(other.index.month).reindex(stats.index.get_level_values('month'))
+                compare = (comparison.name, other)
+            
             self.fig.clear()
-            plotting.plot_monthly_dashboard(self.fig, stats, year)
+            plotting.plot_monthly_dashboard(self.fig, stats, year, events, compare)
             self.canvas.draw()
         except Exception: pass
 
 class DailyConsumptionTab(BaseAnalysisTab):
+    uses_comparison = True
+    
     def get_columns(self): return ("Дата", "Спож.", "Сер.", "Макс")
     
     def add_controls(self):
@@ -175,19 +261,17 @@ class DailyConsumptionTab(BaseAnalysisTab):
         self.month_combo.set('1')
         
     def update_controls_state(self):
-        if self.app.df is not None:
-            years = sorted(self.app.df['year'].unique().astype(str))
-            self.year_combo['values'] = years
-            if years: self.year_combo.set(years[0])
+        years = self.get_years()
+        self.year_combo['values'] = years
+        if years: self.year_combo.set(years[0])
             
     def update_data(self):
-        if self.app.df is None: return
+        if not self.has_data(): return
         try:
             y, m = int(self.year_combo.get()), int(self.month_combo.get())
-            data = self.app.df[(self.app.df['year'] == y) & (self.app.df['month'] == m)]
+            data = self.get_slice(year=y, month=m)
             
-            stats = data.groupby(['date', 'day_type']).agg({'load_mw': ['sum', 'mean', 'max']}).round(1)
-            stats.columns = ['total_energy', 'avg_load', 'max_load']
+            stats = queries.daily_stats(data)
             
             self.clear_tree()
             for (d, t), r in stats.iterrows():
@@ -201,7 +285,12 @@ class DailyConsumptionTab(BaseAnalysisTab):
             self.fig.clear()
             ax = self.fig.add_subplot(111)
             month_name = data['month_name'].iloc[0] if not data.empty else ""
-            plotting.plot_daily_consumption(ax, stats, y, month_name)
+            compare = None
+            comparison = self.get_comparison()
+            if comparison is not None:
+                days = pd.DatetimeIndex([pd.Timestamp(d) for d, _ in stats.index])
+                compare = (comparison.name, comparison.daily['other_total'].reindex(days).to_numpy())
+            plotting.plot_daily_consumption(ax, stats, y, month_name, compare)
             self.canvas.draw()
         except Exception: pass
 
@@ -213,12 +302,17 @@ class MonthlyConsumptionTab(BaseAnalysisTab):
                  style='Card.TLabel').pack(side=tk.LEFT)
                  
     def update_data(self):
-        if self.app.df is None: return
+        if not self.has_data(): return
         try:
-            stats = self.app.df.groupby(['year', 'month_name', 'month']).agg({
-                'load_mw': ['sum', 'mean', 'max'], 'date': 'nunique'
-            }).round(1)
-            stats.columns = ['total_energy', 'avg_load', 'max_load', 'days_count']
+            if self.app.df is not None:
+                stats = queries.yearly_comparison(self.app.df)
+            else:
+                # Готове місячне зведення з SQLite замість groupby по всій історії
+                rollup = self.app.stored_run.monthly_rollup()
+                rollup['month_name'] = rollup['month'].map(logic.MONTH_NAMES_UA)
+                stats = rollup.set_index(['year', 'month_name', 'month'])[
+                    ['total_mwh', 'avg_load', 'max_load', 'days_count']
+                ].rename(columns={'total_mwh': 'total_energy'})
             stats = stats.sort_index(level=['year', 'month'])
             
             self.clear_tree()
@@ -237,3 +331,305 @@ class MonthlyConsumptionTab(BaseAnalysisTab):
             plotting.plot_monthly_consumption(ax, stats)
             self.canvas.draw()
         except Exception: pass
+
+class AnomalyTab(BaseAnalysisTab):
+    def get_columns(self): return ("Час", "МВт", "Норма", "z")
+    
+    def add_controls(self):
+        ttk.Label(self.controls_area, text="Рік:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.year_combo = ttk.Combobox(self.controls_area, state="readonly", width=8)
+        self.year_combo.pack(side=tk.LEFT, padx=5)
+        
+    def update_controls_state(self):
+        if self.app.df is not None:
+            years = sorted(self.app.df['year'].unique().astype(str))
+            self.year_combo['values'] = years
+            if years: self.year_combo.set(years[0])
+            
+    def update_data(self):
+        events = self.get_analytics('anomalies')
+        if self.app.df is None or events is None:
+            self.show_needs_dataset()
+            return
+        try:
+            year = int(self.year_combo.get())
+            data = self.app.df[self.app.df['year'] == year]
+            year_events = events[events['timestamp'].dt.year == year]
+            
+            self.clear_tree()
+            for _, r in year_events.iterrows():
+                self.tree.insert("", "end", values=(
+                    r['timestamp'].strftime('%m-%d %H:00'), 
+                    f"{r['load_mw']:.0f}", 
+                    f"{r['baseline']:.0f}", 
+                    f"{r['z_score']:+.1f}"
+                ))
+            
+            self.fig.clear()
+            plotting.plot_anomaly_timeline(self.fig, data, year_events, year)
+            self.canvas.draw()
+        except Exception: pass
+
+class SensitivityTab(BaseAnalysisTab):
+    def get_columns(self): return ("Період", "МВт/°C", "T сер", "R²")
+    
+    def add_controls(self):
+        ttk.Label(self.controls_area, text="Період:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.period_combo = ttk.Combobox(self.controls_area, state="readonly", width=10,
+                                         values=list(sensitivity.PERIODS.values()))
+        self.period_combo.pack(side=tk.LEFT, padx=5)
+        self.period_combo.set(sensitivity.PERIODS['W'])
+        
+    def update_data(self):
+        fits = self.get_analytics('sensitivity')
+        if self.app.df is None or fits is None:
+            self.show_needs_dataset()
+            return
+        try:
+            label = self.period_combo.get()
+            period = next(k for k, v in sensitivity.PERIODS.items() if v == label)
+            table = fits[period]
+            
+            self.clear_tree()
+            for start, r in table.iterrows():
+                self.tree.insert("", "end", values=(
+                    start.strftime('%Y-%m-%d'), 
+                    f"{r['sensitivity']:.1f}", 
+                    f"{r['temp_mean']:.1f}", 
+                    f"{r['r2']:.2f}"
+                ))
+            
+            self.fig.clear()
+            plotting.plot_sensitivity_trend(self.fig, table, label)
+            self.canvas.draw()
+        except Exception: pass
+
+class PeakTab(BaseAnalysisTab):
+    def get_columns(self): return ("№", "Час", "МВт", "Temp")
+    
+    def add_controls(self):
+        ttk.Label(self.controls_area, text="Рік:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.year_combo = ttk.Combobox(self.controls_area, state="readonly", width=8)
+        self.year_combo.pack(side=tk.LEFT, padx=5)
+        
+        # Крива тривалості за весь рік або за окремий місяць
+        ttk.Label(self.controls_area, text="Період:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.period_combo = ttk.Combobox(self.controls_area, state="readonly", width=10,
+                                         values=["Рік"] + [logic.MONTH_NAMES_UA[m] for m in range(1, 13)])
+        self.period_combo.pack(side=tk.LEFT, padx=5)
+        self.period_combo.set("Рік")
+        
+    def update_controls_state(self):
+        if self.app.df is not None:
+            years = sorted(self.app.df['year'].unique().astype(str))
+            self.year_combo['values'] = years
+            if years: self.year_combo.set(years[0])
+            
+    def update_data(self):
+        result = self.get_analytics('peaks')
+        if self.app.df is None or result is None:
+            self.show_needs_dataset()
+            return
+        try:
+            year = int(self.year_combo.get())
+            month = self.period_combo.current() or None  # 0 — весь рік
+            top = result['top'][result['top']['year'] == year]
+            
+            self.clear_tree()
+            for _, r in top.iterrows():
+                self.tree.insert("", "end", values=(
+                    r['rank'], 
+                    r['timestamp'].strftime('%m-%d %H:00'), 
+                    f"{r['load_mw']:.0f}", 
+                    f"{r['temperature_c']:.1f}"
+                ))
+            
+            self.fig.clear()
+            if month is None:
+                plotting.plot_peak_dashboard(self.fig, result['levels'], result['curves'], year, top)
+            else:
+                plotting.plot_peak_dashboard(self.fig, result['levels'], result['monthly_curves'], year, top, month)
+            self.canvas.draw()
+        except Exception: pass
+
+class ReserveTab(BaseAnalysisTab):
+    def get_columns(self): return ("Початок", "Год", "Мін МВт", "Тип")
+    
+    def add_controls(self):
+        ttk.Label(self.controls_area, text="Рік:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.year_combo = ttk.Combobox(self.controls_area, state="readonly", width=8)
+        self.year_combo.pack(side=tk.LEFT, padx=5)
+        
+    def update_controls_state(self):
+        if self.app.df is not None:
+            years = sorted(self.app.df['year'].unique().astype(str))
+            self.year_combo['values'] = years
+            if years: self.year_combo.set(years[0])
+            
+    def update_data(self):
+        result = self.get_analytics('reserve')
+        if self.app.df is None or result is None:
+            self.show_needs_dataset()
+            return
+        try:
+            year = int(self.year_combo.get())
+            data = self.app.df[self.app.df['year'] == year]
+            events = result['events'][result['events']['year'] == year]
+            monthly = result['monthly'][result['monthly']['year'] == year]
+            
+            _, margin_pct = reserve.reserve_margin(data)
+            daily_margin = pd.Series(margin_pct, index=data['timestamp']).resample('D').min()
+            
+            self.clear_tree()
+            for _, r in events.iterrows():
+                self.tree.insert("", "end", values=(
+                    r['start'].strftime('%m-%d %H:00'), 
+                    f"{r['duration_h']:.0f}", 
+                    f"{r['min_margin_mw']:.0f}", 
+                    r['kind']
+                ))
+            
+            self.fig.clear()
+            plotting.plot_reserve_dashboard(self.fig, daily_margin, events, monthly, result['threshold_pct'], year)
+            self.canvas.draw()
+        except Exception: pass
+
+class SpectralTab(BaseAnalysisTab):
+    def get_columns(self): return ("Цикл", "Період", "МВт", "% дисп.")
+    
+    def add_controls(self):
+        ttk.Label(self.controls_area, text="Піків:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.peaks_combo = ttk.Combobox(self.controls_area, state="readonly", width=5, values=['5', '10', '15'])
+        self.peaks_combo.pack(side=tk.LEFT, padx=5)
+        self.peaks_combo.set('10')
+        
+    def update_data(self):
+        result = self.get_analytics('spectral')
+        if self.app.df is None or result is None:
+            self.show_needs_dataset()
+            return
+        try:
+            n_peaks = int(self.peaks_combo.get())
+            
+            self.clear_tree()
+            for _, r in result['cycles'].iterrows():
+                self.tree.insert("", "end", values=(
+                    r['cycle'], r['period'], f"{r['amplitude_mw']:.0f}", f"{r['variance_share']:.1f}"
+                ))
+            for _, r in result['peaks'].head(n_peaks).iterrows():
+                self.tree.insert("", "end", values=(
+                    "Пік", r['period'], f"{r['amplitude_mw']:.0f}", f"{r['variance_share']:.1f}"
+                ))
+            
+            self.fig.clear()
+            plotting.plot_spectral_dashboard(self.fig, result, n_peaks)
+            self.canvas.draw()
+        except Exception: pass
+
+class LiveTab(BaseAnalysisTab):
+    """Живий режим: потік відліків у кільцевий буфер, графік з фіксованою частотою кадрів"""
+    FPS = 10
+    WINDOW = 24 * 7  # відліків на графіку
+    
+    def get_columns(self): return ("Дата", "Енергія", "Сер.", "Макс")
+    def view_inputs(self): return ()  # потік не залежить від активного датасету
+    
+    def setup_layout(self):
+        super().setup_layout()
+        self.tree.tag_configure('month', foreground=plotting.THEME['line_secondary'])
+    
+    def add_controls(self):
+        self.sim = None
+        self.frame_no = 0
+        self.line = None
+        
+        ttk.Label(self.controls_area, text="Джерело:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.source_combo = ttk.Combobox(self.controls_area, state="readonly", width=8, values=["Модель", "CSV"])
+        self.source_combo.pack(side=tk.LEFT, padx=5)
+        self.source_combo.set("Модель")
+        
+        ttk.Label(self.controls_area, text="Відліків/с:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.speed_combo = ttk.Combobox(self.controls_area, state="readonly", width=7,
+                                        values=["10", "100", "1000", "5000", "20000"])
+        self.speed_combo.pack(side=tk.LEFT, padx=5)
+        self.speed_combo.set("100")
+        
+        ttk.Label(self.controls_area, text="Крок, хв:", style='Card.TLabel').pack(side=tk.LEFT)
+        self.step_combo = ttk.Combobox(self.controls_area, state="readonly", width=4, values=["60", "15"])
+        self.step_combo.pack(side=tk.LEFT, padx=5)
+        self.step_combo.set("60")
+        
+        self.start_btn = ttk.Button(self.controls_area, text="▶ Старт", command=self.start_live)
+        self.start_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.controls_area, text="■ Стоп", command=self.stop_live).pack(side=tk.LEFT)
+        
+    def start_live(self):
+        self.stop_live()
+        step = int(self.step_combo.get())
+        if self.source_combo.get() == "CSV":
+            path = filedialog.askopenfilename(initialdir=self.app.output_dir.get(),
+                                              filetypes=[("CSV", "*.csv"), ("Усі файли", "*.*")])
+            if not path: return
+            try:
+                # Крок — з міток часу файлу (15-хвилинний CSV дає 4 відліки на годину)
+                step = streaming.csv_hours_per_sample(path) * 60
+            except Exception as e:
+                messagebox.showerror("Live", f"Не вдалося прочитати CSV: {e}")
+                return
+            source = streaming.csv_source(path)
+        else:
+            seed = 42 if self.app.random_mode.get() == "reproducible" else None
+            source = streaming.model_source(int(self.app.start_year.get()), seed, step)
+        
+        self.sim = streaming.LiveSimulator(source, samples_per_sec=float(self.speed_combo.get()),
+                                           capacity=self.WINDOW * 4, hours_per_sample=step / 60)
+        self.window = max(int(round(self.WINDOW * 60 / step)), 2)
+        self.sim.start()
+        self.start_btn.state(['disabled'])
+        self.fig.clear()
+        self.ax = self.fig.add_subplot(111)
+        self.line, = self.ax.plot([], [], color=plotting.THEME['line_primary'], linewidth=1.5)
+        plotting.setup_chart_style(self.ax, 'Live', 'Години відносно останнього відліку', 'МВт')
+        self.after(0, self.render_frame)
+        
+    def stop_live(self):
+        if self.sim is not None:
+            self.sim.stop()
+            self.sim = None
+        self.start_btn.state(['!disabled'])
+        
+    def shutdown(self):
+        self.stop_live()
+        
+    def render_frame(self):
+        """Один кадр: лише set_data для вже створеної лінії, таблиця — раз на секунду"""
+        if self.sim is None: return
+        ts, load, days, current, months, peak, count = self.sim.snapshot(self.window)
+        if len(ts):
+            self.line.set_data((ts - ts[-1]) / 3.6e12, load)
+            self.ax.relim()
+            self.ax.autoscale_view()
+            peak_txt = f" | Пік: {peak[1]:.0f} МВт ({peak[0]:%Y-%m-%d %H:%M})" if peak[0] is not None else ""
+            self.ax.set_title(f"Live: {pd.Timestamp(int(ts[-1])):%Y-%m-%d %H:%M} | {count} відліків{peak_txt}",
+                              color=plotting.THEME['fg'], fontsize=9, fontweight='bold')
+            self.canvas.draw_idle()
+        
+        if self.frame_no % self.FPS == 0:
+            self.clear_tree()
+            # Місячні агрегати (поточний місяць — разом з незавершеною добою), далі доби
+            for y, m, energy, avg, mx in months[::-1]:
+                self.tree.insert("", "end", values=(f"{y}-{m:02d}", f"{energy:.0f}", f"{avg:.1f}", f"{mx:.1f}"),
+                                 tags=('month',))
+            rows = ([current] if current else []) + days[::-1]
+            for d, energy, avg, mx in rows:
+                self.tree.insert("", "end", values=(str(d), f"{energy:.0f}", f"{avg:.1f}", f"{mx:.1f}"))
+        self.frame_no += 1
+        
+        if self.sim.running:
+            self.after(1000 // self.FPS, self.render_frame)
+        else:
+            error = self.sim.error
+            self.stop_live()
+            if error:
+                self.app.status_text.set("Live: помилка джерела")
+                messagebox.showerror("Live", f"Потік зупинено через помилку джерела:\n{error}")
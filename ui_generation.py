@@ -2,16 +2,49 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
 import os
+import itertools
 import platform
 import subprocess
 import logging
 import logic
+import ingest
+import anomalies
+import sensitivity
+import peaks
+import reserve
+import spectral
+import scenarios
+import instrumentation
+import storage
+import pipeline
+
+# Підписи етапів конвеєра для статус-бару
+STAGE_LABELS = {
+    'generate': "Генерація...",
+    'prepare': "Обчислення...",
+    'analytics': "Аналітика...",
+    'csv': "Збереження CSV...",
+    'excel': "Excel звіт...",
+    'summary': "Текстовий звіт...",
+    'sqlite': "Збереження в SQLite...",
+}
+
+def files_missing(paths):
+    """Перевірка етапів-звітів: причина перезапуску, якщо збереженого файлу немає."""
+    # None — звіт не вдалося створити (create_excel_report повертає None): етап повторюється
+    paths = paths if isinstance(paths, list) else [paths]
+    if any(p is None for p in paths):
+        return "попередній запуск не створив файл"
+    missing = [p for p in paths if not os.path.exists(p)]
+    return f"файл відсутній: {os.path.basename(missing[0])}" if missing else None
 
 class GenerationTab(ttk.Frame):
     def __init__(self, parent, app_context):
         super().__init__(parent)
         self.app = app_context
         self.pack(fill='both', expand=True)
+        self.pipeline = self.build_pipeline()
+        self._random_runs = itertools.count(1)
         self.setup_ui()
 
     def setup_ui(self):
@@ -65,6 +98,37 @@ class GenerationTab(ttk.Frame):
         ttk.Entry(dir_frame, textvariable=self.app.output_dir, width=35).pack(side='left', padx=(0,5), fill='x', expand=True)
         ttk.Button(dir_frame, text="...", width=3, command=self.select_output_dir).pack(side='left')
 
+        # Профілювання
+        ttk.Checkbutton(grid_frame, text="Профілювання (cProfile) для наступного запуску",
+                        variable=self.app.profile_enabled).grid(row=3, column=0, columnspan=2, padx=5, pady=10, sticky='w')
+
+        # Індексоване сховище SQLite (energy.db у папці результатів)
+        ttk.Checkbutton(grid_frame, text="Зберігати прогони в SQLite (energy.db)",
+                        variable=self.app.store_enabled).grid(row=4, column=0, columnspan=2, padx=5, pady=(0, 10), sticky='w')
+
+        # Сценарії (іменовані датасети) та порівняння
+        scenario_panel = ttk.LabelFrame(left_panel, text=" Сценарії ", padding=15)
+        scenario_panel.pack(fill='x', pady=(15, 0))
+        scenario_grid = ttk.Frame(scenario_panel, style='Card.TFrame')
+        scenario_grid.pack(fill='x')
+
+        ttk.Label(scenario_grid, text="Активний:", style='Card.TLabel').grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        self.active_combo = ttk.Combobox(scenario_grid, state="readonly", width=32, textvariable=self.app.active_scenario)
+        self.active_combo.grid(row=0, column=1, padx=5, pady=5, sticky='w')
+        self.active_combo.bind("<<ComboboxSelected>>", lambda e: self.app.activate_scenario(self.app.active_scenario.get()))
+
+        ttk.Label(scenario_grid, text="Порівняти з:", style='Card.TLabel').grid(row=1, column=0, padx=5, pady=5, sticky='w')
+        self.compare_combo = ttk.Combobox(scenario_grid, state="readonly", width=32, textvariable=self.app.compare_with)
+        self.compare_combo.grid(row=1, column=1, padx=5, pady=5, sticky='w')
+        self.compare_combo.bind("<<ComboboxSelected>>", lambda e: self.app.update_comparison())
+
+        ttk.Label(scenario_grid, text="З бази SQLite:", style='Card.TLabel').grid(row=2, column=0, padx=5, pady=5, sticky='w')
+        stored_frame = ttk.Frame(scenario_grid, style='Card.TFrame')
+        stored_frame.grid(row=2, column=1, padx=5, pady=5, sticky='w')
+        self.stored_combo = ttk.Combobox(stored_frame, state="readonly", width=26, postcommand=self.refresh_stored_runs)
+        self.stored_combo.pack(side='left')
+        ttk.Button(stored_frame, text="Відкрити", width=9, command=self.open_stored_run).pack(side='left', padx=(5, 0))
+
         # Права панель (Дії)
         right_panel = ttk.Frame(content_frame, style='Card.TFrame')
         right_panel.pack(side='right', fill='both', expand=True, padx=(10, 0))
@@ -76,6 +140,9 @@ class GenerationTab(ttk.Frame):
                                      command=self.start_analysis, style='Accent.TButton')
         self.generate_btn.pack(fill='x', pady=(0, 10), ipady=5)
         
+        self.import_btn = ttk.Button(action_frame, text="Імпорт CSV (виміряні дані)", command=self.start_import)
+        self.import_btn.pack(fill='x', pady=(0, 10))
+
         ttk.Button(action_frame, text="Відкрити папку", command=self.open_results_dir).pack(fill='x')
 
         # Статус бар (замість великого тексту)
@@ -89,6 +156,12 @@ class GenerationTab(ttk.Frame):
         self.progress_bar = ttk.Progressbar(status_frame, variable=self.app.progress, maximum=100)
         self.progress_bar.pack(fill='x')
 
+        # Розбивка по етапах (етап, мс, рядків/с, МБ)
+        self.metrics_lbl = ttk.Label(status_frame, textvariable=self.app.metrics_text,
+                                   style='Card.TLabel', font=('Consolas', 8), justify='left')
+        self.metrics_lbl.pack(anchor='w', pady=(10, 0))
+        instrumentation.tracker.add_listener(self.on_span_finished)
+
         self.update_mode_buttons()
 
     def set_random_mode(self, mode):
@@ -105,6 +178,25 @@ class GenerationTab(ttk.Frame):
             self.reproducible_btn.state(['!pressed'])
             self.random_btn.state(['pressed'])
 
+    def refresh_scenario_lists(self):
+        names = self.app.scenarios.names()
+        self.active_combo['values'] = names
+        self.compare_combo['values'] = [scenarios.NO_COMPARISON] + names
+
+    def refresh_stored_runs(self):
+        try:
+            runs = storage.list_runs(self.app.db_path())
+        except Exception as e:
+            logging.warning(f"SQLite недоступна: {e}")
+            return
+        self.stored_combo['values'] = [f"#{r.run_id} {r.name} ({r.start_year}-{r.end_year})"
+                                       for r in runs.itertuples()]
+
+    def open_stored_run(self):
+        selected = self.stored_combo.get()
+        if selected:
+            self.app.open_stored_run(int(selected[1:].split()[0]))
+
     def select_output_dir(self):
         directory = filedialog.askdirectory(initialdir=self.app.output_dir.get())
         if directory:
@@ -127,7 +219,9 @@ class GenerationTab(ttk.Frame):
             e_year = int(self.app.end_year.get())
             if s_year > e_year: raise ValueError
             
+            # Імпорт і генерація не виконуються одночасно (спільний tracker та finish_success)
             self.generate_btn.config(state='disabled')
+            self.import_btn.config(state='disabled')
             self.app.status_text.set("Обробка...")
             
             thread = threading.Thread(target=self.run_analysis_thread, args=(s_year, e_year))
@@ -136,23 +230,149 @@ class GenerationTab(ttk.Frame):
         except ValueError:
             messagebox.showerror("Помилка", "Перевірте роки")
 
+    def build_pipeline(self):
+        """
+        DAG етапів запуску: кожен етап перераховується лише при зміні своїх параметрів
+        або результату попереднього етапу (pipeline.py).
+        """
+        return (pipeline.Pipeline()
+            .add('generate', lambda start_year, end_year, random_seed, nonce:
+                 logic.generate_power_load_data(start_year, end_year, random_seed),
+                 params=('start_year', 'end_year', 'random_seed', 'nonce'))
+            .add('prepare', logic.prepare_data, deps=('generate',))
+            .add('analytics', self.compute_analytics, deps=('prepare',))
+            .add('csv', lambda df, analytics, output_dir:
+                 logic.export_raw_csv(df, logic.ensure_output_dir(output_dir), analytics['reserve']),
+                 deps=('prepare', 'analytics'), params=('output_dir',), check=files_missing)
+            .add('excel', lambda df, analytics, output_dir, random_mode:
+                 logic.create_excel_report(df, logic.ensure_output_dir(output_dir), random_mode,
+                                           analytics['peaks'], analytics['reserve']),
+                 deps=('prepare', 'analytics'), params=('output_dir', 'random_mode'), check=files_missing)
+            .add('summary', lambda df, output_dir, random_mode:
+                 logic.create_text_report(df, logic.ensure_output_dir(output_dir), random_mode),
+                 deps=('prepare',), params=('output_dir', 'random_mode'), check=files_missing)
+            .add('sqlite', lambda df, db_path, run_name, random_mode:
+                 storage.save_run(db_path, df, run_name, random_mode) if db_path else None,
+                 deps=('prepare',), params=('db_path', 'run_name', 'random_mode')))
+
     def run_analysis_thread(self, start_year, end_year):
+        tracker = instrumentation.tracker
+        tracker.reset()
+        output_dir = self.app.output_dir.get()
+        mode = self.app.random_mode.get()
         try:
-            self.update_progress_safe(10, "Ініціалізація...")
-            seed = 42 if self.app.random_mode.get() == "reproducible" else None
-            
-            raw_df = logic.generate_power_load_data(start_year, end_year, seed)
-            self.update_progress_safe(50, "Обчислення...")
-            processed_df = logic.prepare_data(raw_df)
-            
-            self.update_progress_safe(80, "Збереження...")
-            logic.create_csv_reports(processed_df, self.app.output_dir.get(), self.app.random_mode.get())
-            
+            with instrumentation.profiled(self.app.profile_enabled.get(), output_dir):
+                seed = 42 if mode == "reproducible" else None
+                name = f"{logic.get_random_mode_description(mode)} {start_year}-{end_year}"
+                context = {
+                    'start_year': start_year,
+                    'end_year': end_year,
+                    'random_seed': seed,
+                    # Випадковий режим щоразу дає нові дані — відбиток має змінюватись
+                    'nonce': 0 if seed is not None else next(self._random_runs),
+                    'output_dir': os.path.abspath(output_dir),
+                    'random_mode': mode,
+                    'db_path': self.app.db_path() if self.app.store_enabled.get() else None,
+                    'run_name': name,
+                }
+                outputs = self.pipeline.run(
+                    context,
+                    on_stage=lambda stage, i, total: self.update_progress_safe(
+                        10 + 85 * i // total, STAGE_LABELS.get(stage, stage))
+                )
+                processed_df, analytics = outputs['prepare'], outputs['analytics']
+                # Відбиток аналітики визначає і дані, і їхню аналітику (див. pipeline.fingerprint)
+                fingerprint = self.pipeline.last_run['fingerprints']['analytics']
+
             self.update_progress_safe(100, "Готово")
-            self.app.root.after(0, lambda: self.finish_success(processed_df))
+            self.app.root.after(0, lambda: self.finish_success(processed_df, analytics, name=name,
+                                                               fingerprint=fingerprint))
             
         except Exception as e:
             self.app.root.after(0, lambda: self.finish_error(str(e)))
+        finally:
+            # Профілювання — лише для одного запуску: знімаємо прапорець у потоці Tk
+            self.app.root.after(0, lambda: self.app.profile_enabled.set(False))
+
+    def start_import(self):
+        path = filedialog.askopenfilename(
+            initialdir=self.app.output_dir.get(),
+            filetypes=[("CSV", "*.csv"), ("Усі файли", "*.*")]
+        )
+        if not path:
+            return
+        self.generate_btn.config(state='disabled')
+        self.import_btn.config(state='disabled')
+        self.app.status_text.set("Імпорт...")
+
+        thread = threading.Thread(target=self.run_import_thread, args=(path,))
+        thread.daemon = True
+        thread.start()
+
+    def run_import_thread(self, path):
+        tracker = instrumentation.tracker
+        tracker.reset()
+        try:
+            self.update_progress_safe(10, "Читання CSV...")
+            with tracker.span("ingest") as s:
+                raw_df, report = ingest.read_load_csv(path)
+                s.rows = report['rows_read']
+
+            self.update_progress_safe(70, "Обчислення...")
+            with tracker.span("prepare", len(raw_df)):
+                processed_df = logic.prepare_data(raw_df)
+
+            self.update_progress_safe(85, "Аналітика...")
+            analytics = self.compute_analytics(processed_df)
+
+            name = os.path.basename(path)
+            stat = os.stat(path)
+            fingerprint = pipeline.fingerprint('import', os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+            if self.app.store_enabled.get():
+                self.update_progress_safe(95, "Збереження в SQLite...")
+                with tracker.span("storage", len(processed_df)):
+                    storage.save_run(self.app.db_path(), processed_df, name, mode='import')
+
+            self.update_progress_safe(100, "Готово")
+            message = (f"Дані імпортовано!\nПрочитано рядків: {report['rows_read']}\n"
+                       f"Годин: {report['hours']}, заповнено пропусків: {report['gap_hours_filled']}, "
+                       f"дублікатів DST: {report['duplicate_hours']}")
+            if report['unparsed_rows']:
+                message += f"\nНе розпізнано час у рядках: {report['unparsed_rows']} (відкинуто)"
+            self.app.root.after(0, lambda: self.finish_success(processed_df, analytics, message, name,
+                                                                   status="Імпорт завершено",
+                                                                   fingerprint=fingerprint))
+
+        except Exception as e:
+            self.app.root.after(0, lambda: self.finish_error(str(e)))
+
+    def compute_analytics(self, df):
+        """Аналітичні модулі поверх підготовлених даних (виконується у робочому потоці)"""
+        tracker = instrumentation.tracker
+        tasks = {
+            'anomalies': (anomalies.detect_anomalies, {}),
+            'sensitivity': (sensitivity.fit_all_periods, {}),
+            'peaks': (peaks.compute_peak_analytics, {}),
+            'reserve': (reserve.compute_reserve_analytics, {}),
+            'spectral': (spectral.compute_spectral_analytics, {}),
+        }
+
+        # Послідовно: усі модулі векторизовані (~1 с на 50 років); пул процесів зі спільною
+        # пам'яттю заміряно — його запуск коштує кілька секунд і лише сповільнював аналітику
+        analytics = {}
+        for name, (func, kwargs) in tasks.items():
+            with tracker.span(name, len(df)):
+                analytics[name] = func(df, **kwargs)
+
+        quality = anomalies.evaluate_detection(analytics['anomalies'], df)
+        if quality:
+            logging.info(f"Якість детектора аномалій (відносно інжектованих): {quality}")
+
+        return analytics
+
+    def on_span_finished(self, span):
+        # Викликається з будь-якого потоку — оновлюємо Tk лише через after()
+        self.app.root.after(0, lambda: self.app.metrics_text.set(instrumentation.tracker.format_breakdown()))
 
     def update_progress_safe(self, val, msg):
         self.app.root.after(0, lambda: self._update_prog(val, msg))
@@ -161,15 +381,17 @@ class GenerationTab(ttk.Frame):
         self.app.progress.set(val)
         self.app.status_text.set(msg)
 
-    def finish_success(self, df):
-        self.app.df = df
-        self.app.refresh_all_tabs()
-        self.app.status_text.set("Симуляцію завершено")
+    def finish_success(self, df, analytics, message=None, name="Сценарій", status="Симуляцію завершено",
+                       fingerprint=None):
+        self.app.register_dataset(name, df, analytics, fingerprint)
+        self.app.status_text.set(status)
         self.generate_btn.config(state='normal')
+        self.import_btn.config(state='normal')
         # Стандартне Windows повідомлення
-        messagebox.showinfo("Успіх", f"Дані успішно згенеровано!\nВсього записів: {len(df)}")
+        messagebox.showinfo("Успіх", message or f"Дані успішно згенеровано!\nВсього записів: {len(df)}")
 
     def finish_error(self, error_msg):
         self.app.status_text.set("Помилка")
         self.generate_btn.config(state='normal')
+        self.import_btn.config(state='normal')
         messagebox.showerror("Помилка", str(error_msg))